@@ -4,15 +4,34 @@ Main script for Mondriaan de Denker podcast generator
 Using ProjectManager for proper path management
 """
 
+import argparse
 from pathlib import Path
 from src.project_utils import ProjectManager
 
 def main():
+    parser = argparse.ArgumentParser(description="Mondriaan de Denker podcast generator")
+    parser.add_argument("--batch", action="store_true",
+                        help="Render every script in the project's scripts/ folder (or the given scripts)")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Only report billable characters and estimated render time")
+    parser.add_argument("scripts", nargs="*", help="Script files for --batch")
+    args = parser.parse_args()
+    
     # Setup project manager met je base directory
     pm = ProjectManager(base_dir=r"C:\local_dev")
     
     # Load het Mondriaan project
     try:
+        if args.batch:
+            outputs = pm.render_batch("Mondriaan_podcast", script_files=args.scripts or None,
+                                      dry_run=args.dry_run)
+            if args.dry_run:
+                return
+            for episode, output_file in outputs.items():
+                status = f"✅ {output_file}" if output_file else "❌ failed"
+                print(f"   {episode}: {status}")
+            return
+        
         generator = pm.create_generator("Mondriaan_podcast")
         
         print("🎙️ Mondriaan de Denker Podcast Generator")
@@ -35,6 +54,10 @@ def main():
 [emma]: [thoughtful] (fluister) Dat is eigenlijk heel mooi... (/fluister) [enthusiastic] Vertel eens meer over die filosofie!
 """
         
+        if args.dry_run:
+            generator.dry_run(script)
+            return
+        
         # Generate podcast - output gaat automatisch naar project/output/
         output_file = generator.create_podcast(script, "episode_test_advanced")
         
@@ -4,6 +4,11 @@ with voice-specific volume adjustments
 """
 
 import os
+import shutil
+import subprocess
+import tempfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
 # Setup FFmpeg BEFORE importing pydub to avoid warnings
 os.environ["PATH"] += os.pathsep + r"C:\ffmpeg\bin"
@@ -11,10 +16,50 @@ os.environ["PATH"] += os.pathsep + r"C:\ffmpeg\bin"
 from pydub import AudioSegment
 from pydub.effects import normalize
 
+try:
+    import numpy as np
+except ImportError:  # Only the numpy assembly engine needs it
+    np = None
+
+from . import mp3_frames
+from .speech_segment import SpeechSegment, PCM_SAMPLE_WIDTH, PCM_CHANNELS
+
+# Peak level after normalization, as pydub.effects.normalize(headroom=0.1)
+NORMALIZE_HEADROOM_DB = 0.1
+
+ASSEMBLY_ENGINES = ("numpy", "pydub", "ffmpeg", "streaming", "frames")
+
+# ffmpeg engine: EBU R128 loudness normalization in the same run as the encode
+FFMPEG_LOUDNORM = "loudnorm=I=-16:TP=-1.5:LRA=11"
+# Inputs per ffmpeg run; longer episodes are assembled in chunks and joined with the concat demuxer
+FFMPEG_CHUNK_SIZE = 100
+
+# End of input for the decode look-ahead; audio_files entries themselves may be None
+_END = object()
+
 class AudioProcessor:
     """Handles audio file operations and processing with advanced voice balancing"""
     
-    def __init__(self):
+    def __init__(self, engine="numpy", decode_workers=0):
+        """
+        Args:
+            engine (str): How segments are assembled: "numpy" mixes into one preallocated
+                          buffer in linear time, "pydub" concatenates AudioSegments,
+                          "ffmpeg" does everything in one native filtergraph run,
+                          "streaming" pipes normalized PCM to the encoder in bounded memory,
+                          "frames" joins MP3 frames losslessly without normalizing (drafts).
+                          "numpy" and "streaming" fall back to "pydub" without numpy; "frames"
+                          re-encodes with numpy or pydub when the inputs are not all MP3.
+            decode_workers (int): Segments decoded in parallel (each decode is an ffmpeg
+                                  subprocess). 0 uses one per CPU core, 1 decodes serially.
+        """
+        if engine not in ASSEMBLY_ENGINES:
+            raise ValueError(f"Unknown assembly engine '{engine}', expected one of {ASSEMBLY_ENGINES}")
+        if engine in ("numpy", "streaming") and np is None:
+            print("⚠️ numpy not installed, using the pydub assembly engine")
+            engine = "pydub"
+        self.engine = engine
+        self.decode_workers = decode_workers or os.cpu_count() or 1
         self._setup_ffmpeg()
     
     def _setup_ffmpeg(self):
@@ -31,66 +76,479 @@ class AudioProcessor:
             print(f"✗ FFmpeg not found at {ffmpeg_path}")
             exit(1)
     
+    def _load_segment(self, item, voice_volumes):
+        """Decode one segment (SpeechSegment or file path) and look up its voice volume
+        
+        Returns:
+            tuple: (AudioSegment, volume_adjustment) or (None, 0) if the item is unusable.
+        """
+        if isinstance(item, SpeechSegment):
+            if item.is_pcm:
+                # Raw samples need no decoding at all; drop a trailing partial sample if any
+                usable = len(item.audio) - len(item.audio) % (PCM_SAMPLE_WIDTH * PCM_CHANNELS)
+                segment = AudioSegment(
+                    data=item.audio[:usable],
+                    sample_width=PCM_SAMPLE_WIDTH,
+                    frame_rate=item.sample_rate,
+                    channels=PCM_CHANNELS
+                )
+            else:
+                segment = AudioSegment.from_file(item.as_buffer(), format=item.audio_format)
+            return segment, voice_volumes.get(item.voice_name, 0)
+        
+        if not item or not os.path.exists(item):
+            return None, 0
+        
+        return AudioSegment.from_mp3(item), self._voice_volume(item, voice_volumes)
+    
+    def _voice_volume(self, item, voice_volumes):
+        """Volume adjustment for a SpeechSegment or legacy segment file"""
+        if isinstance(item, SpeechSegment):
+            return voice_volumes.get(item.voice_name, 0)
+        
+        # Legacy file input: the voice is encoded in the temp file name
+        for voice_name, volume in voice_volumes.items():
+            if f'temp_{voice_name}_' in item:
+                return volume
+        return 0
+    
+    def _load_segments(self, audio_files, voice_volumes):
+        """Decode all segments, fanning ffmpeg decodes out over a thread pool
+        
+        Returns:
+            list: (AudioSegment, volume_adjustment) per item, in input order.
+        """
+        needs_decoding = sum(1 for item in audio_files if not (isinstance(item, SpeechSegment) and item.is_pcm))
+        workers = min(self.decode_workers, needs_decoding)
+        if workers <= 1:
+            return [self._load_segment(item, voice_volumes) for item in audio_files]
+        
+        print(f"⚡ Decoding {needs_decoding} segments with {workers} workers")
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(lambda item: self._load_segment(item, voice_volumes), audio_files))
+    
     def combine_audio_segments(self, audio_files, output_file, pause_indices=None, voice_volumes=None, normal_gap=150, pause_gap=800):
-        """Combine multiple audio files with voice-specific volume balancing"""
+        """Combine multiple audio segments with voice-specific volume balancing
+        
+        audio_files may contain in-memory SpeechSegment objects, file paths, or a mix.
+        """
         segments = []
         voice_volumes = voice_volumes or {}
         
         print(f"🎵 Combining {len(audio_files)} audio segments...")
         print(f"📊 Voice volumes: {voice_volumes}")
         
-        for file in audio_files:
-            if file and os.path.exists(file):
-                segment = AudioSegment.from_mp3(file)
-                
-                # Apply voice-specific volume adjustment
-                volume_adjustment = 0
-                for voice_name, volume in voice_volumes.items():
-                    if f'temp_{voice_name}_' in file:
-                        volume_adjustment = volume
-                        print(f"🔊 Applying {volume:+d}dB to {voice_name}")
-                        break
-                
-                if volume_adjustment != 0:
-                    segment = segment + volume_adjustment
-                
-                segments.append(segment)
-                print(f"✓ Loaded {file} ({len(segment)}ms, {volume_adjustment:+d}dB)")
+        if self.engine == "ffmpeg":
+            return self._combine_ffmpeg(audio_files, output_file, set(pause_indices or []),
+                                        voice_volumes, normal_gap, pause_gap)
+        if self.engine == "streaming":
+            return self._combine_streaming(audio_files, output_file, set(pause_indices or []),
+                                           voice_volumes, normal_gap, pause_gap)
+        if self.engine == "frames":
+            try:
+                return self._combine_frames(audio_files, output_file, set(pause_indices or []),
+                                            voice_volumes, normal_gap, pause_gap)
+            except ValueError as e:
+                print(f"⚠️ Lossless MP3 concatenation not possible ({e}), re-encoding instead")
+        
+        for item, (segment, volume_adjustment) in zip(audio_files, self._load_segments(audio_files, voice_volumes)):
+            if segment is None:
+                continue
+            
+            segments.append((segment, volume_adjustment))
+            print(f"✓ Loaded {item} ({len(segment)}ms, {volume_adjustment:+d}dB)")
         
         if not segments:
             print("✗ No valid audio segments to combine")
             return None
         
-        # Combine all segments with smart gaps
+        pause_indices = set(pause_indices or [])
+        if self.engine != "pydub" and np is not None:
+            final_audio = self._mix_numpy(segments, pause_indices, normal_gap, pause_gap)
+        else:
+            final_audio = self._mix_pydub(segments, pause_indices, normal_gap, pause_gap)
+        
+        # Single encode of the whole episode; the container follows the file extension
+        export_format = os.path.splitext(output_file)[1].lstrip('.').lower() or "mp3"
+        if export_format == "mp3":
+            final_audio.export(output_file, format="mp3", bitrate="128k")
+        else:
+            final_audio.export(output_file, format=export_format)
+        
+        duration_minutes = len(final_audio) / 1000 / 60
+        print(f"✓ Combined podcast: {output_file} ({duration_minutes:.1f} minutes)")
+        
+        return output_file
+    
+    def _mix_pydub(self, segments, pause_indices, normal_gap, pause_gap):
+        """Concatenate AudioSegments with gaps, then normalize the episode"""
         final_audio = AudioSegment.empty()
-        pause_indices = pause_indices or []
         
-        for i, segment in enumerate(segments):
+        for i, (segment, volume_adjustment) in enumerate(segments):
+            # Apply voice-specific volume adjustment
+            if volume_adjustment != 0:
+                segment = segment + volume_adjustment
             final_audio += segment
             
             # Add gap only if not the last segment
             if i < len(segments) - 1:
                 if i in pause_indices:
                     # Longer pause after [PAUZE] markers
-                    gap_duration = pause_gap
-                    final_audio += AudioSegment.silent(duration=gap_duration)
-                    print(f"🔇 Added {gap_duration}ms pause after segment {i}")
+                    final_audio += AudioSegment.silent(duration=pause_gap)
+                    print(f"🔇 Added {pause_gap}ms pause after segment {i}")
                 else:
                     # Short natural gap between speakers
                     final_audio += AudioSegment.silent(duration=normal_gap)
         
         # Final normalization of entire podcast
         print("🎚️ Normalizing final audio...")
-        final_audio = normalize(final_audio)
+        return normalize(final_audio, headroom=NORMALIZE_HEADROOM_DB)
+    
+    def _mix_numpy(self, segments, pause_indices, normal_gap, pause_gap):
+        """Write segments, gaps and gains into one preallocated buffer
         
-        # Export with quality settings
-        final_audio.export(output_file, format="mp3", bitrate="128k")
+        The episode length and the normalization gain are known before any sample
+        is written, so every segment is scaled and copied exactly once.
+        """
+        # Everything is mixed at the format of the first segment (mono 16-bit for ElevenLabs)
+        reference = segments[0][0]
+        frame_rate, channels = reference.frame_rate, reference.channels
         
-        duration_minutes = len(final_audio) / 1000 / 60
+        tracks = [(self._to_samples(segment, frame_rate, channels), 10 ** (volume_adjustment / 20))
+                  for segment, volume_adjustment in segments]
+        
+        def gap_samples(milliseconds):
+            return int(round(frame_rate * milliseconds / 1000)) * channels
+        
+        gaps = []
+        for i in range(len(tracks) - 1):
+            gaps.append(gap_samples(pause_gap if i in pause_indices else normal_gap))
+            if i in pause_indices:
+                print(f"🔇 Added {pause_gap}ms pause after segment {i}")
+        gaps.append(0)
+        
+        # Peak normalization: the peak after per-voice gain decides one global factor
+        print("🎚️ Normalizing final audio...")
+        peak = max(self._peak(samples) * gain for samples, gain in tracks)
+        scale = self._normalize_scale(peak)
+        
+        output = np.zeros(sum(samples.size for samples, _ in tracks) + sum(gaps), dtype=np.int16)
+        position = 0
+        for (samples, gain), gap in zip(tracks, gaps):
+            output[position:position + samples.size] = self._scale_samples(samples, gain * scale)
+            position += samples.size + gap
+        
+        return AudioSegment(
+            data=output.tobytes(),
+            sample_width=2,
+            frame_rate=frame_rate,
+            channels=channels
+        )
+    
+    @staticmethod
+    def _to_samples(segment, frame_rate, channels):
+        """16-bit samples of an AudioSegment, converted to the episode format if needed"""
+        if (segment.frame_rate, segment.channels, segment.sample_width) != (frame_rate, channels, 2):
+            segment = segment.set_frame_rate(frame_rate).set_channels(channels).set_sample_width(2)
+        return np.frombuffer(segment.raw_data, dtype=np.int16)
+    
+    @staticmethod
+    def _peak(samples):
+        # max/min rather than abs(): abs(-32768) overflows int16
+        return max(int(samples.max()), -int(samples.min())) if samples.size else 0
+    
+    @staticmethod
+    def _normalize_scale(peak):
+        """Factor that brings the episode peak to -NORMALIZE_HEADROOM_DB dBFS"""
+        return 2 ** 15 * 10 ** (-NORMALIZE_HEADROOM_DB / 20) / peak if peak else 1.0
+    
+    @staticmethod
+    def _scale_samples(samples, factor):
+        scaled = samples * np.float32(factor)
+        np.clip(np.rint(scaled, out=scaled), -32768, 32767, out=scaled)
+        return scaled.astype(np.int16)
+    
+    def _iter_segments(self, audio_files, voice_volumes):
+        """Decode segments in order with at most decode_workers decodes in flight
+        
+        Yields:
+            tuple: (item, AudioSegment or None, volume_adjustment)
+        """
+        with ThreadPoolExecutor(max_workers=self.decode_workers) as executor:
+            pending = deque()
+            items = iter(audio_files)
+            for item in items:
+                pending.append((item, executor.submit(self._load_segment, item, voice_volumes)))
+                if len(pending) >= self.decode_workers:
+                    break
+            while pending:
+                item, future = pending.popleft()
+                next_item = next(items, _END)
+                if next_item is not _END:
+                    pending.append((next_item, executor.submit(self._load_segment, next_item, voice_volumes)))
+                yield (item, *future.result())
+    
+    def _combine_streaming(self, audio_files, output_file, pause_indices, voice_volumes, normal_gap, pause_gap):
+        """Two passes over the segments so only a few are ever decoded at once
+        
+        Pass 1 measures the peak after per-voice gain. Pass 2 decodes again and writes
+        gain-adjusted, normalized PCM plus silent gaps straight into ffmpeg's stdin.
+        """
+        print("🎚️ Measuring peak level (pass 1/2)...")
+        frame_rate = channels = None
+        peak = 0.0
+        usable = []
+        for item, segment, volume_adjustment in self._iter_segments(audio_files, voice_volumes):
+            if segment is None:
+                continue
+            if frame_rate is None:
+                frame_rate, channels = segment.frame_rate, segment.channels
+            samples = self._to_samples(segment, frame_rate, channels)
+            peak = max(peak, self._peak(samples) * 10 ** (volume_adjustment / 20))
+            usable.append(item)
+        
+        if not usable:
+            print("✗ No valid audio segments to combine")
+            return None
+        
+        scale = self._normalize_scale(peak)
+        gap_bytes = {}
+        
+        def silence(milliseconds):
+            if milliseconds not in gap_bytes:
+                frames = int(round(frame_rate * milliseconds / 1000))
+                gap_bytes[milliseconds] = bytes(frames * channels * 2)
+            return gap_bytes[milliseconds]
+        
+        print("🎵 Encoding normalized audio (pass 2/2)...")
+        command = [AudioSegment.converter, "-hide_banner", "-loglevel", "error", "-y",
+                   "-f", "s16le", "-ar", str(frame_rate), "-ac", str(channels), "-i", "pipe:0",
+                   *self._ffmpeg_encode_args(output_file), output_file]
+        # stderr goes to a temp file: an undrained pipe could fill up and stall the encoder
+        error_log = tempfile.TemporaryFile()
+        encoder = subprocess.Popen(command, stdin=subprocess.PIPE, stderr=error_log)
+        total_frames = 0
+        try:
+            for i, (item, segment, volume_adjustment) in enumerate(self._iter_segments(usable, voice_volumes)):
+                samples = self._to_samples(segment, frame_rate, channels)
+                encoder.stdin.write(self._scale_samples(samples, 10 ** (volume_adjustment / 20) * scale).tobytes())
+                total_frames += samples.size // channels
+                print(f"✓ Streamed {item} ({len(segment)}ms, {volume_adjustment:+d}dB)")
+                
+                if i < len(usable) - 1:
+                    gap = pause_gap if i in pause_indices else normal_gap
+                    if i in pause_indices:
+                        print(f"🔇 Added {gap}ms pause after segment {i}")
+                    encoder.stdin.write(silence(gap))
+                    total_frames += len(silence(gap)) // (2 * channels)
+            encoder.stdin.close()
+        except BrokenPipeError:
+            pass  # The encoder died; its stderr explains why
+        except BaseException:
+            # A segment failed to decode: stop the encoder instead of leaving it waiting on stdin
+            encoder.kill()
+            encoder.wait()
+            error_log.close()
+            if os.path.exists(output_file):
+                os.remove(output_file)
+            raise
+        finally:
+            try:
+                encoder.stdin.close()
+            except BrokenPipeError:
+                pass
+        with error_log:
+            if encoder.wait() != 0:
+                error_log.seek(0)
+                print(f"✗ Streaming assembly failed: {error_log.read().decode(errors='replace').strip()}")
+                return None
+        
+        duration_minutes = total_frames / frame_rate / 60
         print(f"✓ Combined podcast: {output_file} ({duration_minutes:.1f} minutes)")
+        return output_file
+    
+    def _combine_frames(self, audio_files, output_file, pause_indices, voice_volumes, normal_gap, pause_gap):
+        """Join MP3 segments frame by frame, without decoding, normalizing or re-encoding
+        
+        Per-voice volume is applied through the frames' global_gain, in steps of 1.5dB,
+        and gaps are runs of silent frames, rounded to whole frames. Xing/Info headers
+        are dropped, so encoder delay/padding of each segment stays in the output.
+        
+        Raises:
+            ValueError: If the output is not MP3 or the segments do not share one MP3 format.
+        """
+        if os.path.splitext(output_file)[1].lower() not in ("", ".mp3"):
+            raise ValueError(f"output {output_file} is not MP3")
+        
+        tracks = []  # (item, frames, gain steps)
+        stream_header = None
+        for item in audio_files:
+            if isinstance(item, SpeechSegment):
+                if item.audio_format != "mp3":
+                    raise ValueError(f"{item} is {item.audio_format}, not mp3")
+                data = item.audio
+            elif item and os.path.exists(item):
+                with open(item, "rb") as f:
+                    data = f.read()
+            else:
+                continue
+            
+            frames = list(mp3_frames.iter_frames(data))
+            if not frames:
+                raise ValueError(f"no MP3 frames in {item}")
+            if stream_header is None:
+                stream_header = frames[0][0]
+            if not all(mp3_frames.same_stream_format(stream_header, header) for header, _ in frames):
+                raise ValueError(f"{item} does not match the MP3 format of the first segment")
+            
+            steps = round(self._voice_volume(item, voice_volumes) / mp3_frames.GLOBAL_GAIN_STEP_DB)
+            tracks.append((item, frames, steps))
+        
+        if not tracks:
+            print("✗ No valid audio segments to combine")
+            return None
         
+        frame_ms = 1000 * mp3_frames.samples_per_frame(stream_header) / stream_header.sample_rate
+        silence = mp3_frames.silent_frame(stream_header)
+        total_frames = 0
+        
+        with open(output_file, "wb") as output:
+            for i, (item, frames, steps) in enumerate(tracks):
+                for header, frame in frames:
+                    output.write(mp3_frames.adjust_global_gain(frame, header, steps))
+                total_frames += len(frames)
+                print(f"✓ Copied {item} ({len(frames)} frames, "
+                      f"{steps * mp3_frames.GLOBAL_GAIN_STEP_DB:+.1f}dB)")
+                
+                if i < len(tracks) - 1:
+                    gap_frames = round((pause_gap if i in pause_indices else normal_gap) / frame_ms)
+                    if i in pause_indices:
+                        print(f"🔇 Added {gap_frames * frame_ms:.0f}ms pause after segment {i}")
+                    output.write(silence * gap_frames)
+                    total_frames += gap_frames
+        
+        duration_minutes = total_frames * frame_ms / 1000 / 60
+        print(f"✓ Combined podcast: {output_file} ({duration_minutes:.1f} minutes, lossless)")
         return output_file
     
+    def _combine_ffmpeg(self, audio_files, output_file, pause_indices, voice_volumes, normal_gap, pause_gap):
+        """Assemble, normalize and encode the episode with ffmpeg instead of in Python
+        
+        One run takes every segment as an input and applies per-voice volume. It
+        inserts anullsrc gaps, concatenates, runs loudnorm and encodes. With more
+        than FFMPEG_CHUNK_SIZE segments, chunks are first rendered to lossless WAV
+        and then joined, normalized and encoded through the concat demuxer.
+        """
+        work_dir = tempfile.mkdtemp(prefix="podcast_assembly_")
+        try:
+            inputs = []  # (ffmpeg input arguments, volume adjustment)
+            sample_rate = 44100
+            for i, item in enumerate(audio_files):
+                input_args = self._ffmpeg_input(item, i, work_dir)
+                if input_args is None:
+                    continue
+                if isinstance(item, SpeechSegment) and not inputs:
+                    sample_rate = item.sample_rate
+                inputs.append((input_args, self._voice_volume(item, voice_volumes)))
+                print(f"✓ Queued {item} ({inputs[-1][1]:+d}dB)")
+            
+            if not inputs:
+                print("✗ No valid audio segments to combine")
+                return None
+            
+            # Gap after each segment (none after the last), in seconds
+            gaps = [(pause_gap if i in pause_indices else normal_gap) / 1000 for i in range(len(inputs) - 1)] + [0]
+            encode_args = self._ffmpeg_encode_args(output_file)
+            
+            if len(inputs) <= FFMPEG_CHUNK_SIZE:
+                self._run_ffmpeg_concat(inputs, gaps, sample_rate, work_dir, "episode",
+                                        f"{FFMPEG_LOUDNORM},aresample={sample_rate}", encode_args, output_file)
+            else:
+                chunk_files = []
+                for start in range(0, len(inputs), FFMPEG_CHUNK_SIZE):
+                    chunk_file = os.path.join(work_dir, f"chunk_{len(chunk_files):04d}.wav")
+                    self._run_ffmpeg_concat(inputs[start:start + FFMPEG_CHUNK_SIZE],
+                                            gaps[start:start + FFMPEG_CHUNK_SIZE],
+                                            sample_rate, work_dir, f"chunk_{len(chunk_files):04d}",
+                                            None, ["-c:a", "pcm_s16le"], chunk_file)
+                    chunk_files.append(chunk_file)
+                    print(f"🧩 Assembled chunk {len(chunk_files)} ({chunk_file})")
+                
+                list_file = os.path.join(work_dir, "chunks.txt")
+                with open(list_file, "w", encoding="utf-8") as f:
+                    for chunk_file in chunk_files:
+                        f.write(f"file '{os.path.abspath(chunk_file)}'\n")
+                self._run_ffmpeg([
+                    "-f", "concat", "-safe", "0", "-i", list_file,
+                    "-af", f"{FFMPEG_LOUDNORM},aresample={sample_rate}",
+                    *encode_args, output_file
+                ])
+        except (OSError, RuntimeError) as e:
+            print(f"✗ ffmpeg assembly failed: {e}")
+            return None
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+        
+        print(f"✓ Combined podcast: {output_file}")
+        return output_file
+    
+    def _ffmpeg_input(self, item, index, work_dir):
+        """ffmpeg input arguments for a segment; in-memory audio is spilled to work_dir"""
+        if isinstance(item, SpeechSegment):
+            path = item.file_path
+            if not path or not os.path.exists(path):
+                extension = "pcm" if item.is_pcm else item.audio_format
+                path = os.path.join(work_dir, f"segment_{index:05d}.{extension}")
+                with open(path, "wb") as f:
+                    f.write(item.audio)
+            if item.is_pcm:
+                return ["-f", "s16le", "-ar", str(item.sample_rate), "-ac", str(PCM_CHANNELS), "-i", path]
+            return ["-i", path]
+        
+        if not item or not os.path.exists(item):
+            return None
+        return ["-i", item]
+    
+    def _ffmpeg_encode_args(self, output_file):
+        export_format = os.path.splitext(output_file)[1].lstrip('.').lower() or "mp3"
+        if export_format == "mp3":
+            return ["-c:a", "libmp3lame", "-b:a", "128k"]
+        if export_format == "wav":
+            return ["-c:a", "pcm_s16le"]
+        return []
+    
+    def _run_ffmpeg_concat(self, inputs, gaps, sample_rate, work_dir, name, post_filter, encode_args, output_file):
+        """One ffmpeg run: volume per input, silence gaps, concat, optional post filter, encode"""
+        chains = []
+        labels = []
+        for i, ((_, volume), gap) in enumerate(zip(inputs, gaps)):
+            chains.append(f"[{i}:a]aresample={sample_rate},aformat=sample_fmts=s16:channel_layouts=mono,"
+                          f"volume={volume}dB[s{i}]")
+            labels.append(f"[s{i}]")
+            if gap:
+                chains.append(f"anullsrc=r={sample_rate}:cl=mono,atrim=duration={gap:g},"
+                              f"aformat=sample_fmts=s16[g{i}]")
+                labels.append(f"[g{i}]")
+        
+        concat = f"{''.join(labels)}concat=n={len(labels)}:v=0:a=1"
+        chains.append(f"{concat},{post_filter}[out]" if post_filter else f"{concat}[out]")
+        
+        # A script file keeps long filtergraphs off the command line
+        script_file = os.path.join(work_dir, f"{name}.filter")
+        with open(script_file, "w", encoding="utf-8") as f:
+            f.write(";\n".join(chains))
+        
+        args = []
+        for input_args, _ in inputs:
+            args.extend(input_args)
+        self._run_ffmpeg([*args, "-filter_complex_script", script_file, "-map", "[out]", *encode_args, output_file])
+    
+    def _run_ffmpeg(self, args):
+        command = [AudioSegment.converter, "-hide_banner", "-loglevel", "error", "-y", *args]
+        result = subprocess.run(command, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.strip() or f"ffmpeg exited with {result.returncode}")
+    
     def create_pause(self, duration_ms):
         """Create a silent audio segment"""
         return AudioSegment.silent(duration=duration_ms)
@@ -0,0 +1,106 @@
+"""
+Batch rendering of several episodes through one shared pool of TTS workers
+"""
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+
+class BatchScheduler:
+    """Renders many episodes with one global TTS work queue
+
+    All segments of all episodes are submitted to a single bounded worker pool,
+    so the API concurrency limit stays saturated across episode boundaries. Each
+    episode is assembled on a separate thread as soon as its last segment has
+    finished, while the other episodes keep synthesizing.
+    """
+
+    def __init__(self, generator, max_workers=None):
+        """
+        Args:
+            generator (PodcastGenerator): Generator used to plan, synthesize and assemble episodes.
+            max_workers (int, optional): TTS requests in flight across the whole batch.
+                                         Defaults to [podcast] max_concurrent_requests.
+        """
+        self.generator = generator
+        if max_workers is None:
+            max_workers = generator.config['podcast'].get('max_concurrent_requests', 1)
+        self.max_workers = max(1, max_workers)
+
+    def render(self, episodes, **options):
+        """Render a batch of episodes
+
+        Args:
+            episodes (list): (output_name, script) pairs.
+            **options: keep_segments, checkpoint and resume, as for create_podcast.
+
+        Returns:
+            dict: output_name -> path of the rendered episode, or None on failure.
+        """
+        generator = self.generator
+        outputs = {output_name: None for output_name, _ in episodes}  # Keeps the input order
+
+        # Planning is cheap and touches shared generator state, so do it up front
+        planned = []
+        for output_name, script in episodes:
+            try:
+                planned.append((output_name, generator.prepare_episode(script, output_name, **options)))
+            except Exception as e:
+                print(f"❌ Could not plan {output_name}: {e}")
+
+        total_jobs = sum(len(episode['pending_jobs']) for _, episode in planned)
+        print(f"📚 Batch: {len(planned)} episodes, {total_jobs} segments, "
+              f"up to {self.max_workers} concurrent requests")
+
+        results = {name: {} for name, _ in planned}
+        failures = {name: {} for name, _ in planned}
+        remaining = {name: len(episode['pending_jobs']) for name, episode in planned}
+
+        # Assembly is CPU and memory heavy; one at a time, overlapping with synthesis
+        with ThreadPoolExecutor(max_workers=1) as assembler, \
+                ThreadPoolExecutor(max_workers=self.max_workers) as workers:
+            assemblies = {}
+
+            def assemble(name, episode):
+                assemblies[assembler.submit(
+                    generator.assemble_episode, episode, results[name], failures[name]
+                )] = name
+
+            futures = {}
+            for name, episode in planned:
+                if not episode['pending_jobs']:
+                    assemble(name, episode)
+                    continue
+                # Episode by episode, longest lines first, so early episodes finish early
+                schedule = sorted(episode['pending_jobs'], key=lambda job: len(job['text']), reverse=True)
+                for job in schedule:
+                    future = workers.submit(
+                        generator._synthesize_segment, job, episode['logger'], episode['manifest']
+                    )
+                    futures[future] = (name, episode, job)
+
+            for future in as_completed(futures):
+                name, episode, job = futures[future]
+                try:
+                    segment = future.result()
+                except Exception as e:
+                    segment = None
+                    failures[name][job['index']] = str(e)
+                if segment is None and job['index'] not in failures[name]:
+                    failures[name][job['index']] = "TTS conversion returned no audio"
+                results[name][job['index']] = segment
+
+                remaining[name] -= 1
+                if remaining[name] == 0:
+                    print(f"🧩 All segments of {name} done, assembling")
+                    assemble(name, episode)
+
+            for future in as_completed(assemblies):
+                name = assemblies[future]
+                try:
+                    outputs[name] = future.result()
+                except Exception as e:
+                    print(f"❌ Assembly of {name} failed: {e}")
+
+        succeeded = sum(1 for path in outputs.values() if path)
+        print(f"📚 Batch complete: {succeeded} of {len(outputs)} episodes rendered")
+        return outputs
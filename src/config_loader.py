@@ -64,6 +64,16 @@ def load_config(config_dir="config"):
     if 'voices' in config:
         voices = dict(config['voices'])
     
+    # Segment cache lives next to the project config unless an absolute path is given
+    cache_dir = config.get('cache', 'directory', fallback=os.path.join('cache', 'tts'))
+    if not os.path.isabs(cache_dir):
+        cache_dir = os.path.join(os.path.dirname(os.path.abspath(config_dir)), cache_dir)
+    
+    # Request latencies measured for dry-run estimates, stored like the cache
+    latency_history = config.get('podcast', 'latency_history', fallback=os.path.join('cache', 'latency_history.json'))
+    if not os.path.isabs(latency_history):
+        latency_history = os.path.join(os.path.dirname(os.path.abspath(config_dir)), latency_history)
+    
     return {
         'api_key': secrets['elevenlabs']['api_key'],
         'voices': voices,
@@ -73,11 +83,42 @@ def load_config(config_dir="config"):
             'model': config.get('audio', 'model', fallback='eleven_multilingual_v2'),
             'optimize_streaming_latency': config.getint('audio', 'optimize_streaming_latency', fallback=0),
             'output_format': config.get('audio', 'output_format', fallback='mp3_44100_128'),
+            'streaming': config.getboolean('audio', 'streaming', fallback=False),
         },
         'podcast': {
             'default_pause_duration': config.getfloat('podcast', 'default_pause_duration', fallback=0.5),
             'long_pause_duration': config.getfloat('podcast', 'long_pause_duration', fallback=1.0),
             'episode_intro_music': config.getboolean('podcast', 'episode_intro_music', fallback=True),
             'episode_outro_music': config.getboolean('podcast', 'episode_outro_music', fallback=True),
+            'max_concurrent_requests': config.getint('podcast', 'max_concurrent_requests', fallback=1),
+            'keep_segments': config.getboolean('podcast', 'keep_segments', fallback=False),
+            'checkpoint': config.getboolean('podcast', 'checkpoint', fallback=False),
+            'export_format': config.get('podcast', 'export_format', fallback='mp3'),
+            'assembly_engine': config.get('podcast', 'assembly_engine', fallback='numpy'),
+            'decode_workers': config.getint('podcast', 'decode_workers', fallback=0),
+            'latency_history': latency_history,
+        },
+        'cache': {
+            'enabled': config.getboolean('cache', 'enabled', fallback=True),
+            'directory': cache_dir,
+            'max_size_mb': config.getfloat('cache', 'max_size_mb', fallback=1024),
+            'max_age_days': config.getfloat('cache', 'max_age_days', fallback=90),
+        },
+        'http': {
+            'pool_size': config.getint('http', 'pool_size', fallback=10),
+            'connect_timeout': config.getfloat('http', 'connect_timeout', fallback=10),
+            'read_timeout': config.getfloat('http', 'read_timeout', fallback=120),
+            'max_retries': config.getint('http', 'max_retries', fallback=4),
+            'backoff_base': config.getfloat('http', 'backoff_base', fallback=1.0),
+            'backoff_max': config.getfloat('http', 'backoff_max', fallback=30.0),
+        },
+        'rate_limit': {
+            'enabled': config.getboolean('rate_limit', 'enabled', fallback=False),
+            'requests_per_second': config.getfloat('rate_limit', 'requests_per_second', fallback=5),
+            'characters_per_minute': config.getfloat('rate_limit', 'characters_per_minute', fallback=0),
+            'initial_concurrency': config.getint('rate_limit', 'initial_concurrency', fallback=2),
+            'min_concurrency': config.getint('rate_limit', 'min_concurrency', fallback=1),
+            'max_concurrency': config.getint('rate_limit', 'max_concurrency', fallback=16),
+            'latency_p95_threshold': config.getfloat('rate_limit', 'latency_p95_threshold', fallback=0),
         }
     }
\ No newline at end of file
@@ -4,49 +4,234 @@ with advanced voice settings support
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+import asyncio
 import os
+import random
+import time
+
+try:
+    import aiohttp
+except ImportError:  # Only needed for AsyncElevenLabsClient
+    aiohttp = None
+
+# Status codes that indicate a transient condition worth retrying
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+DEFAULT_MODEL_ID = "eleven_multilingual_v2"
+
+# Bytes read per iteration from the streaming endpoint
+STREAM_CHUNK_SIZE = 16 * 1024
+
+# Default voice settings (fallback)
+DEFAULT_VOICE_SETTINGS = {
+    "stability": 0.7,
+    "similarity_boost": 0.8,
+    "style": 0.4,
+    "use_speaker_boost": True
+}
+
+def merge_voice_settings(voice_settings=None):
+    """Overlay per-request voice settings on the default settings"""
+    final_settings = DEFAULT_VOICE_SETTINGS.copy()
+    if voice_settings:
+        final_settings.update(voice_settings)
+    return final_settings
+
+def parse_retry_after(value):
+    """Parse a Retry-After header given as seconds or as an HTTP date"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+def backoff_delay(attempt, backoff_base, backoff_max, retry_after=None):
+    """Exponential backoff with full jitter, never shorter than the server's Retry-After"""
+    delay = random.uniform(0, min(backoff_max, backoff_base * (2 ** attempt)))
+    if retry_after is not None:
+        delay = max(delay, retry_after)
+    return delay
 
 class ElevenLabsClient:
     """Client for ElevenLabs text-to-speech API with advanced configuration"""
     
-    def __init__(self, api_key):
+    def __init__(self, api_key, cache=None, pool_size=10, connect_timeout=10, read_timeout=120,
+                 max_retries=4, backoff_base=1.0, backoff_max=30.0, rate_limiter=None,
+                 streaming=False, optimize_streaming_latency=0, output_format="mp3_44100_128"):
         self.api_key = api_key
         self.base_url = "https://api.elevenlabs.io/v1"
         self.headers = {"xi-api-key": api_key}
         self.logger = None  # Will be set by PodcastGenerator
+        self.cache = cache  # Optional TTSCache for reusing unchanged segments
+        self.output_format = output_format  # e.g. mp3_44100_128, or pcm_44100 for raw 16-bit samples
+        self.rate_limiter = rate_limiter  # Optional RateLimiter shared by all clients of this API key
+        
+        # Use the /stream endpoint by default and how aggressively the API trades quality for latency (0-4)
+        self.streaming = streaming
+        self.optimize_streaming_latency = optimize_streaming_latency
+        
+        # Retry/backoff behaviour for 429/5xx and connection errors
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        
+        # One pooled keep-alive session so the TLS handshake is paid once per connection
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def close(self):
+        """Close pooled connections"""
+        self.session.close()
     
-    def text_to_speech(self, text, voice_id, output_file, voice_settings=None, model_id=None, enable_logging=False):
+    def _post_with_retry(self, url, data, stream=False, params=None):
+        """POST through the pooled session, retrying transient failures"""
+        for attempt in range(self.max_retries + 1):
+            is_last_attempt = attempt == self.max_retries
+            if self.rate_limiter:
+                self.rate_limiter.acquire(len(data.get("text", "")))
+            started = time.monotonic()
+            response = None
+            try:
+                response = self.session.post(url, json=data, params=params, stream=stream, timeout=self.timeout)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                connection_error = e
+            finally:
+                # A streamed body is still downloading; its slot is released when the response is closed
+                if self.rate_limiter and (response is None or not stream):
+                    status_code = response.status_code if response is not None else None
+                    self.rate_limiter.release(time.monotonic() - started, status_code)
+            if self.rate_limiter and response is not None and stream:
+                self._release_on_close(response, started)
+            
+            if response is None:
+                if is_last_attempt:
+                    print(f"✗ API request failed after {attempt + 1} attempts: {connection_error}")
+                    return None
+                delay = backoff_delay(attempt, self.backoff_base, self.backoff_max)
+                print(f"⏳ Connection problem ({connection_error.__class__.__name__}), retrying in {delay:.1f}s...")
+                time.sleep(delay)
+                continue
+            
+            if response.status_code not in RETRY_STATUS_CODES or is_last_attempt:
+                return response
+            
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            response.close()  # Hand a streamed connection back to the pool before retrying
+            delay = backoff_delay(attempt, self.backoff_base, self.backoff_max, retry_after)
+            print(f"⏳ API returned {response.status_code}, retrying in {delay:.1f}s "
+                  f"(attempt {attempt + 1}/{self.max_retries})...")
+            time.sleep(delay)
+        
+        return None
+    
+    def _release_on_close(self, response, started):
+        """Hold the rate limiter slot of a streamed response until it is closed
+        
+        Every consumer closes the response once the body is read (or abandoned), so
+        the limiter sees the full request duration, not just the time to the headers.
         """
-        Convert text to speech with advanced voice customization.
+        close = response.close
+        released = False
         
-        Args:
-            text (str): The text to convert to speech.
-            voice_id (str): The ID of the voice to use.
-            output_file (str): The path to save the generated audio file.
-            voice_settings (dict, optional): Dictionary of voice settings (stability, similarity_boost, etc.).
-            model_id (str, optional): The ID of the model to use. Defaults to "eleven_multilingual_v2".
-            enable_logging (bool, optional): If False, "Zero Retention Mode" is used for this request,
-                                            meaning history features are unavailable and data is not logged.
-                                            Defaults to False.
+        def close_and_release():
+            nonlocal released
+            close()
+            if not released:
+                released = True
+                self.rate_limiter.release(time.monotonic() - started, response.status_code)
+        
+        response.close = close_and_release
+    
+    def _stream_to_file(self, response, output_file, chunk_callback=None):
+        """Write a streamed response to disk chunk by chunk
+        
+        Audio goes to a .part file that only replaces output_file once the stream
+        completed, so an interrupted stream never leaves a truncated segment behind.
+        
+        Returns:
+            int: Number of bytes written, or 0 if the stream broke off.
+        """
+        part_file = f"{output_file}.part"
+        bytes_written = 0
+        try:
+            with open(part_file, "wb") as f:
+                for chunk in response.iter_content(chunk_size=STREAM_CHUNK_SIZE):
+                    if not chunk:
+                        continue
+                    f.write(chunk)
+                    bytes_written += len(chunk)
+                    if chunk_callback:
+                        chunk_callback(chunk)
+        except (requests.exceptions.ChunkedEncodingError, requests.exceptions.ConnectionError) as e:
+            print(f"✗ Stream interrupted after {bytes_written:,} bytes: {e}")
+            os.remove(part_file)
+            return 0
+        finally:
+            response.close()
+        
+        os.replace(part_file, output_file)
+        return bytes_written
+    
+    def _stream_to_memory(self, response, chunk_callback=None):
+        """Collect a streamed response in memory, forwarding chunks as they arrive
+        
+        Returns:
+            bytes: The audio, or None if the stream broke off.
+        """
+        chunks = []
+        try:
+            for chunk in response.iter_content(chunk_size=STREAM_CHUNK_SIZE):
+                if not chunk:
+                    continue
+                chunks.append(chunk)
+                if chunk_callback:
+                    chunk_callback(chunk)
+        except (requests.exceptions.ChunkedEncodingError, requests.exceptions.ConnectionError) as e:
+            print(f"✗ Stream interrupted after {sum(len(c) for c in chunks):,} bytes: {e}")
+            return None
+        finally:
+            response.close()
+        
+        return b"".join(chunks)
+    
+    def _start_request(self, text, voice_id, voice_settings, model_id, enable_logging, use_cache, use_stream, target):
+        """Build the request, consult the cache and send it on a miss
+        
+        Returns:
+            tuple: (cached_audio, response, cache_key). On a cache hit only cached_audio is set;
+                   otherwise response is the successful HTTP response, or None on failure.
         """
         url = f"{self.base_url}/text-to-speech/{voice_id}"
+        params = {"output_format": self.output_format}
+        if use_stream:
+            url += "/stream"
+            params["optimize_streaming_latency"] = self.optimize_streaming_latency
         
         # Use provided model_id or default
         if model_id is None:
-            model_id = "eleven_multilingual_v2"
-        
-        # Default voice settings (fallback)
-        default_settings = {
-            "stability": 0.7,
-            "similarity_boost": 0.8,
-            "style": 0.4,
-            "use_speaker_boost": True
-        }
+            model_id = DEFAULT_MODEL_ID
         
         # Use provided settings or defaults
-        final_settings = default_settings.copy()
-        if voice_settings:
-            final_settings.update(voice_settings)
+        final_settings = merge_voice_settings(voice_settings)
         
         data = {
             "text": text, 
@@ -55,22 +240,77 @@ class ElevenLabsClient:
             "enable_logging": enable_logging 
         }
         
-        # Log API call details
+        cache_key = None
+        if self.cache is not None and use_cache:
+            cache_key = self.cache.make_key(text, voice_id, model_id, final_settings, self.output_format)
+            cached_audio = self.cache.get(cache_key)
+            if cached_audio is not None:
+                print(f"♻️ Cache hit: {target} ({len(cached_audio):,} bytes)")
+                return cached_audio, None, cache_key
+        
+        # Log API call details; cache hits above never reach the API
         if self.logger:
-            self.logger.log_api_call(text, voice_id, final_settings, model_id, output_file)
+            self.logger.log_api_call(text, voice_id, final_settings, model_id, target)
         else:
             # Fallback to console logging
             settings_summary = f"stability={final_settings['stability']:.1f}, style={final_settings['style']:.1f}"
             print(f"🔊 Converting with {settings_summary}: '{text[:40]}...'")
         
-        response = requests.post(url, json=data, headers=self.headers)
+        response = self._post_with_retry(url, data, stream=use_stream, params=params)
         
-        if response.status_code != 200:
+        if response is not None and response.status_code != 200:
             print(f"✗ API Error: {response.status_code} - {response.text}")
+            response.close()
+            response = None
+        
+        return None, response, cache_key
+    
+    def text_to_speech(self, text, voice_id, output_file, voice_settings=None, model_id=None, enable_logging=False,
+                       use_cache=True, stream=None, chunk_callback=None):
+        """
+        Convert text to speech with advanced voice customization.
+        
+        Args:
+            text (str): The text to convert to speech.
+            voice_id (str): The ID of the voice to use.
+            output_file (str): The path to save the generated audio file.
+            voice_settings (dict, optional): Dictionary of voice settings (stability, similarity_boost, etc.).
+            model_id (str, optional): The ID of the model to use. Defaults to "eleven_multilingual_v2".
+            enable_logging (bool, optional): If False, "Zero Retention Mode" is used for this request,
+                                            meaning history features are unavailable and data is not logged.
+                                            Defaults to False.
+            use_cache (bool, optional): If False, bypass the segment cache for this call. Defaults to True.
+            stream (bool, optional): Use the streaming endpoint and write audio as it arrives.
+                                     Defaults to the client's streaming setting.
+            chunk_callback (callable, optional): Called with each audio chunk as it arrives (bytes).
+        """
+        use_stream = self.streaming if stream is None else stream
+        cached_audio, response, cache_key = self._start_request(
+            text, voice_id, voice_settings, model_id, enable_logging, use_cache, use_stream, output_file
+        )
+        
+        if cached_audio is not None:
+            with open(output_file, "wb") as f:
+                f.write(cached_audio)
+            if chunk_callback:
+                chunk_callback(cached_audio)
+            return output_file
+        
+        if response is None:
             return None
         
-        with open(output_file, "wb") as f:
-            f.write(response.content)
+        if use_stream:
+            if not self._stream_to_file(response, output_file, chunk_callback):
+                return None
+            if cache_key is not None:
+                self.cache.put_file(cache_key, output_file)
+        else:
+            with open(output_file, "wb") as f:
+                f.write(response.content)
+            if chunk_callback:
+                chunk_callback(response.content)
+            if cache_key is not None:
+                self.cache.put(cache_key, response.content)
         
         # Verify file creation
         if os.path.exists(output_file) and os.path.getsize(output_file) > 0:
@@ -80,7 +320,205 @@ class ElevenLabsClient:
         else:
             print(f"✗ Failed to create {output_file}")
             return None
+    
+    def synthesize(self, text, voice_id, voice_settings=None, model_id=None, enable_logging=False,
+                   use_cache=True, stream=None, chunk_callback=None):
+        """
+        Convert text to speech and return the audio in memory instead of writing a file.
+        
+        Takes the same arguments as text_to_speech, minus output_file.
+        
+        Returns:
+            bytes: The audio in the client's output_format (raw 16-bit mono samples for pcm_*),
+                   or None on failure.
+        """
+        use_stream = self.streaming if stream is None else stream
+        cached_audio, response, cache_key = self._start_request(
+            text, voice_id, voice_settings, model_id, enable_logging, use_cache, use_stream, "memory"
+        )
+        
+        if cached_audio is not None:
+            if chunk_callback:
+                chunk_callback(cached_audio)
+            return cached_audio
+        
+        if response is None:
+            return None
+        
+        if use_stream:
+            audio = self._stream_to_memory(response, chunk_callback)
+        else:
+            audio = response.content
+            if chunk_callback and audio:
+                chunk_callback(audio)
+        
+        if not audio:
+            print(f"✗ No audio received for '{text[:40]}...'")
+            return None
+        
+        if cache_key is not None:
+            self.cache.put(cache_key, audio)
+        
+        print(f"✓ Received {len(audio):,} bytes")
+        return audio
+
+
+class AsyncElevenLabsClient:
+    """Asyncio client for ElevenLabs text-to-speech with a bounded number of requests in flight
+    
+    Shares default settings, caching and retry behaviour with ElevenLabsClient, but
+    never blocks the event loop, so many episodes can be rendered from one loop.
+    """
+    
+    def __init__(self, api_key, cache=None, max_concurrency=4, pool_size=10, connect_timeout=10,
+                 read_timeout=120, max_retries=4, backoff_base=1.0, backoff_max=30.0, rate_limiter=None,
+                 output_format="mp3_44100_128"):
+        if aiohttp is None:
+            raise ImportError("AsyncElevenLabsClient requires aiohttp: pip install aiohttp")
+        
+        self.api_key = api_key
+        self.base_url = "https://api.elevenlabs.io/v1"
+        self.headers = {"xi-api-key": api_key}
+        self.cache = cache
+        self.output_format = output_format
+        self.rate_limiter = rate_limiter
+        
+        self.max_concurrency = max_concurrency
+        self.pool_size = pool_size
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._session = None  # Created lazily inside the running event loop
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+    
+    async def close(self):
+        """Close pooled connections"""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+    
+    def _get_session(self):
+        if self._session is None:
+            self._session = aiohttp.ClientSession(
+                headers=self.headers,
+                connector=aiohttp.TCPConnector(limit=self.pool_size),
+                timeout=aiohttp.ClientTimeout(sock_connect=self.connect_timeout, sock_read=self.read_timeout)
+            )
+        return self._session
+    
+    async def _post_with_retry(self, url, data):
+        """POST through the pooled session, retrying transient failures
         
+        Returns:
+            tuple: (status_code, body) or None if the request never got a response.
+        """
+        session = self._get_session()
+        
+        for attempt in range(self.max_retries + 1):
+            is_last_attempt = attempt == self.max_retries
+            if self.rate_limiter:
+                await self.rate_limiter.acquire_async(len(data.get("text", "")))
+            started = time.monotonic()
+            status = None
+            try:
+                async with session.post(url, json=data, params={"output_format": self.output_format}) as response:
+                    body = await response.read()
+                    status = response.status
+                    retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                connection_error = e
+            finally:
+                if self.rate_limiter:
+                    self.rate_limiter.release(time.monotonic() - started, status)
+            
+            if status is None:
+                if is_last_attempt:
+                    print(f"✗ API request failed after {attempt + 1} attempts: {connection_error}")
+                    return None
+                delay = backoff_delay(attempt, self.backoff_base, self.backoff_max)
+                print(f"⏳ Connection problem ({connection_error.__class__.__name__}), retrying in {delay:.1f}s...")
+                await asyncio.sleep(delay)
+                continue
+            
+            if status not in RETRY_STATUS_CODES or is_last_attempt:
+                return status, body
+            
+            delay = backoff_delay(attempt, self.backoff_base, self.backoff_max, retry_after)
+            print(f"⏳ API returned {status}, retrying in {delay:.1f}s "
+                  f"(attempt {attempt + 1}/{self.max_retries})...")
+            await asyncio.sleep(delay)
+        
+        return None
+    
+    async def text_to_speech(self, text, voice_id, output_file, voice_settings=None, model_id=None,
+                             enable_logging=False, use_cache=True):
+        """
+        Convert text to speech without blocking the event loop.
+        
+        Takes the same arguments and returns the same value as ElevenLabsClient.text_to_speech.
+        At most max_concurrency requests from this client are in flight at any time.
+        """
+        url = f"{self.base_url}/text-to-speech/{voice_id}"
+        
+        if model_id is None:
+            model_id = DEFAULT_MODEL_ID
+        final_settings = merge_voice_settings(voice_settings)
+        
+        data = {
+            "text": text,
+            "model_id": model_id,
+            "voice_settings": final_settings,
+            "enable_logging": enable_logging
+        }
+        
+        cache_key = None
+        if self.cache is not None and use_cache:
+            cache_key = self.cache.make_key(text, voice_id, model_id, final_settings, self.output_format)
+            cached_audio = await asyncio.to_thread(self.cache.get, cache_key)
+            if cached_audio is not None:
+                await asyncio.to_thread(_write_file, output_file, cached_audio)
+                print(f"♻️ Cache hit: {output_file} ({len(cached_audio):,} bytes)")
+                return output_file
+        
+        settings_summary = f"stability={final_settings['stability']:.1f}, style={final_settings['style']:.1f}"
+        print(f"🔊 Converting with {settings_summary}: '{text[:40]}...'")
+        
+        async with self._semaphore:
+            result = await self._post_with_retry(url, data)
+        
+        if result is None:
+            return None
+        
+        status, body = result
+        if status != 200:
+            print(f"✗ API Error: {status} - {body[:200].decode('utf-8', errors='replace')}")
+            return None
+        
+        if not body:
+            print(f"✗ Failed to create {output_file}")
+            return None
+        
+        await asyncio.to_thread(_write_file, output_file, body)
+        if cache_key is not None:
+            await asyncio.to_thread(self.cache.put, cache_key, body)
+        
+        print(f"✓ Created {output_file} ({len(body):,} bytes)")
+        return output_file
+
+
+def _write_file(path, data):
+    with open(path, "wb") as f:
+        f.write(data)
+
 
 def main():
     import datetime
@@ -0,0 +1,106 @@
+"""
+Per-episode checkpoint manifest for resumable podcast generation
+"""
+
+import hashlib
+import json
+import os
+import threading
+
+from .elevenlabs_client import merge_voice_settings
+from .tts_cache import TTSCache
+
+
+def segment_fingerprint(text, voice_id, model_id, voice_settings, output_format):
+    """Hash of everything that determines a segment's audio (same key as the TTS cache)"""
+    return TTSCache.make_key(text, voice_id, model_id, merge_voice_settings(voice_settings), output_format)
+
+
+class EpisodeManifest:
+    """Records every successfully synthesized segment of one episode
+
+    The manifest is rewritten atomically after each segment, so an interrupted
+    render can be resumed by skipping every segment that is still valid. Entries
+    are looked up by content fingerprint rather than position, so after editing
+    a script only inserted or modified lines need to be synthesized again.
+    """
+
+    VERSION = 2  # 2: entries carry a hash of the audio bytes
+
+    def __init__(self, path, episode=None):
+        self.path = path
+        self.episode = episode
+        self.segments = {}  # str(job index) -> entry
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path, episode=None):
+        """Load a manifest from disk; a missing or unreadable file gives an empty manifest"""
+        manifest = cls(path, episode)
+        if not os.path.exists(path):
+            return manifest
+
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"⚠️ Ignoring unreadable manifest {path}: {e}")
+            return manifest
+
+        if data.get("version") == cls.VERSION:
+            manifest.segments = data.get("segments", {})
+        return manifest
+
+    def save(self):
+        """Write the manifest atomically (temp file + rename)"""
+        data = {
+            "version": self.VERSION,
+            "episode": self.episode,
+            "segments": self.segments
+        }
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(temp_path, self.path)
+
+    def record(self, job, segment, save=True):
+        """Checkpoint one finished segment; segment must already be saved to disk"""
+        with self._lock:
+            self.segments[str(job['index'])] = {
+                "line_number": job['line_number'],
+                "speaker": job['speaker'],
+                "voice_name": job['voice_name'],
+                "fingerprint": job['fingerprint'],
+                "settings": job['settings'],
+                "file": segment.file_path,
+                "size": segment.size,
+                "audio_hash": hashlib.sha256(segment.audio).hexdigest()
+            }
+            if save:
+                self.save()
+
+    def files(self):
+        """Get the set of segment files referenced by the manifest"""
+        return {entry.get("file") for entry in self.segments.values() if entry.get("file")}
+
+    def files_by_fingerprint(self):
+        """Map fingerprint -> checkpointed file for every entry whose file is still intact"""
+        intact = {}
+        for entry in self.segments.values():
+            file_path = entry.get("file")
+            if entry.get("fingerprint") in intact or not file_path:
+                continue
+            if self._file_intact(file_path, entry):
+                intact[entry["fingerprint"]] = file_path
+        return intact
+
+    @staticmethod
+    def _file_intact(file_path, entry):
+        """The file still holds exactly the audio that was checkpointed (size first, then content hash)"""
+        try:
+            if os.path.getsize(file_path) != entry.get("size"):
+                return False
+            with open(file_path, "rb") as f:
+                return hashlib.sha256(f.read()).hexdigest() == entry.get("audio_hash")
+        except OSError:
+            return False
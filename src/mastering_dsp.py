@@ -0,0 +1,342 @@
+"""
+Pure-numpy mastering chain: the SoX preset chain without an external DSP binary
+
+Audio is processed chunk by chunk and every stage keeps its state across
+chunks, so files of any length are mastered in bounded memory. Linear filters
+(high-pass, EQ) are biquad cascades applied as a truncated impulse response by
+FFT overlap-add. The dynamics stages (gate, de-esser, limiter)
+follow a block envelope with attack/release smoothing and ramp their gain
+within each block.
+
+Samples are float arrays of shape (frames, channels) in the range [-1, 1].
+"""
+
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+# Dynamics stages measure and change gain per block of this many frames
+BLOCK = 64
+
+# Impulse responses are cut where they have decayed below this level (relative to their peak)
+IR_FLOOR = 1e-7
+
+# Noise gate: signals below -40dB are muted (SoX: compand 0.1,0.2 -inf,-40.1,-inf,-40,-40)
+GATE_THRESHOLD_DB = -40.0
+GATE_ATTACK = 0.1
+GATE_RELEASE = 0.2
+
+HIGHPASS_FREQUENCY = 80
+
+# The SoX compression compands map every level to itself; only this gain (dB) remains
+COMPRESSION_GAIN_DB = {
+    "light": -3.0,
+    "medium": -6.0,
+    "heavy": -8.0,
+}
+
+# (frequency, Q, gain dB) peaking filters, as the SoX equalizer effects
+EQ_BANDS = [(200, 0.7, 2.0), (3000, 0.5, 1.5), (8000, 0.3, -2.0)]
+SIBILANT_CUT = (6500, 0.8, -3.0)
+
+# De-esser: compress the band above this frequency when it gets louder than the threshold.
+# Deliberately unlike SoX, whose "de-esser" is a mild broadband compand
+DEESSER_FREQUENCY = 5000
+DEESSER_THRESHOLD_DB = -30.0
+DEESSER_RATIO = 4.0
+DEESSER_ATTACK = 0.01
+DEESSER_RELEASE = 0.05
+
+# Safety limiter ceiling, before the final normalization (SoX: compand ... 0,-3)
+LIMITER_CEILING_DB = -3.0
+LIMITER_RELEASE = 0.05
+
+
+def db_to_gain(db):
+    return 10 ** (db / 20)
+
+
+def highpass(frequency, sample_rate, q=0.707):
+    """RBJ cookbook 2-pole high-pass, as SoX highpass
+
+    Returns:
+        tuple: (b, a) coefficients.
+    """
+    w0 = 2 * np.pi * frequency / sample_rate
+    alpha = np.sin(w0) / (2 * q)
+    cos_w0 = np.cos(w0)
+    b = [(1 + cos_w0) / 2, -(1 + cos_w0), (1 + cos_w0) / 2]
+    a = [1 + alpha, -2 * cos_w0, 1 - alpha]
+    return b, a
+
+
+def peaking(frequency, sample_rate, q, gain_db):
+    """RBJ cookbook peaking EQ, as SoX equalizer
+
+    Returns:
+        tuple: (b, a) coefficients.
+    """
+    w0 = 2 * np.pi * frequency / sample_rate
+    alpha = np.sin(w0) / (2 * q)
+    amplitude = 10 ** (gain_db / 40)
+    cos_w0 = np.cos(w0)
+    b = [1 + alpha * amplitude, -2 * cos_w0, 1 - alpha * amplitude]
+    a = [1 + alpha / amplitude, -2 * cos_w0, 1 - alpha / amplitude]
+    return b, a
+
+
+def impulse_response(biquads, fft_size=1 << 16):
+    """Impulse response of a biquad cascade, cut where it has decayed below IR_FLOOR
+
+    The cascade's frequency response is sampled on an FFT grid and transformed
+    back. The grid is long enough that time aliasing is far below the cut.
+    """
+    z1 = np.exp(-1j * np.linspace(0, np.pi, fft_size // 2 + 1))
+    response = np.ones_like(z1)
+    for b, a in biquads:
+        response *= (b[0] + b[1] * z1 + b[2] * z1 ** 2) / (a[0] + a[1] * z1 + a[2] * z1 ** 2)
+    ir = np.fft.irfft(response, fft_size)
+
+    significant = np.nonzero(np.abs(ir) > IR_FLOOR * np.abs(ir).max())[0]
+    return ir[:significant[-1] + 1] if significant.size else ir[:1]
+
+
+class LinearFilter:
+    """Biquad cascade applied by FFT overlap-add; the filter tail carries into the next chunk"""
+
+    def __init__(self, biquads):
+        self.ir = impulse_response(biquads)
+        # Fixed FFT size of a few impulse response lengths; each transform filters size - len(ir) + 1 frames
+        self.fft_size = max(4096, 1 << (4 * len(self.ir)).bit_length())
+        self.ir_spectrum = np.fft.rfft(self.ir, self.fft_size)[:, None]
+        self.tail = None
+
+    def process(self, x):
+        n, m = len(x), len(self.ir)
+        if self.tail is None:
+            self.tail = np.zeros((m - 1, x.shape[1]))
+
+        segment = self.fft_size - m + 1
+        full = np.zeros((n + m - 1, x.shape[1]))
+        full[:m - 1] = self.tail
+        for start in range(0, n, segment):
+            piece = x[start:start + segment]
+            spectrum = np.fft.rfft(piece, self.fft_size, axis=0) * self.ir_spectrum
+            full[start:start + len(piece) + m - 1] += np.fft.irfft(spectrum, self.fft_size, axis=0)[:len(piece) + m - 1]
+        self.tail = full[n:]
+        return full[:n]
+
+
+class Dynamics(ABC):
+    """Block envelope follower with per-block gain, ramped within each block
+
+    Subclasses turn the smoothed envelope into a gain per block. Every call but
+    the last must pass a multiple of BLOCK frames.
+    """
+
+    def __init__(self, sample_rate, attack, release, rms=False, instant_attack=False):
+        self.attack = np.exp(-BLOCK / (attack * sample_rate)) if attack else 0.0
+        self.release = np.exp(-BLOCK / (release * sample_rate))
+        self.rms = rms
+        self.instant_attack = instant_attack  # Gain reductions take effect at the block start
+        self.envelope = 0.0
+        self.gain = 1.0  # Gain at the end of the previous block
+
+    def levels(self, x):
+        """Peak or RMS level of each block, over all channels"""
+        blocks = -(-len(x) // BLOCK)
+        padded = np.zeros((blocks * BLOCK, x.shape[1]))
+        padded[:len(x)] = x
+        padded = padded.reshape(blocks, -1)
+        if self.rms:
+            counts = np.full(blocks, BLOCK * x.shape[1])
+            counts[-1] = (len(x) - (blocks - 1) * BLOCK) * x.shape[1]
+            return np.sqrt((padded ** 2).sum(axis=1) / counts)
+        return np.abs(padded).max(axis=1)
+
+    def smooth(self, levels):
+        envelope, attack, release = self.envelope, self.attack, self.release
+        smoothed = []
+        for level in levels.tolist():
+            envelope = level + (attack if level > envelope else release) * (envelope - level)
+            smoothed.append(envelope)
+        self.envelope = envelope
+        return np.array(smoothed)
+
+    @abstractmethod
+    def block_gains(self, envelope):
+        """Smoothed envelope per block (linear) in, linear gain per block out"""
+
+    def gains(self, x, sidechain=None):
+        """Per-frame gain for x, measured on sidechain (defaults to x itself)"""
+        if len(x) == 0:
+            return np.ones(0)
+        targets = self.block_gains(self.smooth(self.levels(x if sidechain is None else sidechain)))
+        starts = np.concatenate(([self.gain], targets[:-1]))
+        if self.instant_attack:
+            starts = np.minimum(starts, targets)
+        ramp = np.arange(1, BLOCK + 1) / BLOCK
+        frames = (starts[:, None] + (targets - starts)[:, None] * ramp).ravel()[:len(x)]
+        self.gain = targets[-1]
+        return frames
+
+    def process(self, x):
+        return x * self.gains(x)[:, None]
+
+
+class Gate(Dynamics):
+    def __init__(self, sample_rate, threshold_db=GATE_THRESHOLD_DB):
+        super().__init__(sample_rate, GATE_ATTACK, GATE_RELEASE)
+        self.threshold = db_to_gain(threshold_db)
+
+    def block_gains(self, envelope):
+        return (envelope >= self.threshold).astype(float)
+
+
+class Compressor(Dynamics):
+    def __init__(self, sample_rate, threshold_db, ratio, attack, release, rms=True):
+        super().__init__(sample_rate, attack, release, rms=rms)
+        self.threshold = db_to_gain(threshold_db)
+        self.ratio = ratio
+
+    def block_gains(self, envelope):
+        over = np.maximum(envelope, self.threshold) / self.threshold
+        return over ** (1 / self.ratio - 1)
+
+
+class Limiter(Dynamics):
+    def __init__(self, sample_rate, ceiling_db=LIMITER_CEILING_DB):
+        super().__init__(sample_rate, 0, LIMITER_RELEASE, instant_attack=True)
+        self.ceiling = db_to_gain(ceiling_db)
+
+    def block_gains(self, envelope):
+        return np.minimum(1.0, self.ceiling / np.maximum(envelope, 1e-12))
+
+    def process(self, x):
+        # Ramps can still let a sample through; clip those to the ceiling
+        return np.clip(super().process(x), -self.ceiling, self.ceiling)
+
+
+class Gain:
+    def __init__(self, db):
+        self.factor = db_to_gain(db)
+
+    def process(self, x):
+        return x * self.factor
+
+
+class DeEsser:
+    """Compresses only the sibilant band, measured on and subtracted from a high-passed copy"""
+
+    def __init__(self, sample_rate):
+        self.band = LinearFilter([highpass(DEESSER_FREQUENCY, sample_rate)])
+        self.compressor = Compressor(sample_rate, DEESSER_THRESHOLD_DB, DEESSER_RATIO,
+                                     DEESSER_ATTACK, DEESSER_RELEASE)
+
+    def process(self, x):
+        band = self.band.process(x)
+        return x + band * (self.compressor.gains(x, sidechain=band) - 1)[:, None]
+
+
+class MasteringChain:
+    """Gate, high-pass, compression gain, EQ, de-esser, sibilant cut and limiter
+
+    Follows what the SoX chain actually does: its compression compands leave
+    levels unchanged, so that stage is only the preset's static gain, and peaks
+    are controlled by the -3dB safety limiter. The de-esser is the one deliberate
+    difference; it works on the sibilant band only (see DeEsser).
+
+    Normalization needs the peak of the whole result, so it is not part of the
+    streaming chain; see normalization_gain().
+    """
+
+    def __init__(self, sample_rate, preset_info):
+        gain_db = COMPRESSION_GAIN_DB.get(preset_info.get('compression'), COMPRESSION_GAIN_DB['medium'])
+        sibilant_frequency, sibilant_q, sibilant_gain = SIBILANT_CUT
+        self.stages = [
+            Gate(sample_rate),
+            LinearFilter([highpass(HIGHPASS_FREQUENCY, sample_rate)]),
+            Gain(gain_db),
+            LinearFilter([peaking(frequency, sample_rate, q, gain) for frequency, q, gain in EQ_BANDS]),
+            DeEsser(sample_rate),
+            LinearFilter([peaking(sibilant_frequency, sample_rate, sibilant_q, sibilant_gain)]),
+            Limiter(sample_rate),
+        ]
+        self.pending = None  # Frames short of a whole block, held for the next call
+
+    def process(self, x, final=False):
+        """Master the next chunk
+
+        Args:
+            x (numpy.ndarray): (frames, channels) float samples.
+            final (bool): Last chunk; flushes frames held back for block alignment.
+
+        Returns:
+            numpy.ndarray: Processed frames. Up to BLOCK - 1 frames may be held
+                           back until the next call, so lengths can differ per call.
+        """
+        x = np.asarray(x, dtype=np.float64)
+        if self.pending is not None:
+            x = np.concatenate((self.pending, x))
+        usable = len(x) if final else len(x) - len(x) % BLOCK
+        self.pending = None if final else x[usable:]
+
+        y = x[:usable]
+        for stage in self.stages:
+            y = stage.process(y)
+        return y
+
+
+def normalization_gain(peak, target_db):
+    """Gain that brings a signal with this sample peak to target_db (SoX norm)"""
+    return db_to_gain(float(target_db)) / peak if peak > 0 else 1.0
+
+
+def peak(samples):
+    return float(np.abs(samples).max(initial=0.0))
+
+
+def from_pcm16(data, channels):
+    """(frames, channels) float samples from 16-bit little-endian PCM bytes"""
+    return np.frombuffer(data, '<i2').reshape(-1, channels) / 32768
+
+
+def to_float32(samples):
+    """Raw 32-bit float bytes, for spooling chain output between the two passes"""
+    return samples.astype('<f4').tobytes()
+
+
+def float32_to_pcm16(data, gain=1.0):
+    """16-bit little-endian PCM bytes from raw 32-bit float bytes, scaled by gain and clipped"""
+    samples = np.frombuffer(data, '<f4') * gain
+    return np.clip(np.round(samples * 32768), -32768, 32767).astype('<i2').tobytes()
+
+
+def master_array(samples, sample_rate, preset_info, chunk_frames=1 << 16):
+    """Master a whole signal held in memory
+
+    Args:
+        samples (numpy.ndarray): (frames,) or (frames, channels); int16 or float in [-1, 1].
+        sample_rate (int): Sample rate in Hz.
+        preset_info (dict): PodcastPostProcessor preset ("compression", "normalization").
+        chunk_frames (int): Frames per processing chunk, a multiple of BLOCK.
+
+    Returns:
+        numpy.ndarray: Mastered float samples, same shape as the input, peak normalized.
+                       An empty input is returned as an empty array of its own dtype.
+    """
+    samples = np.asarray(samples)
+    if len(samples) == 0:
+        return np.empty(samples.shape, dtype=samples.dtype)
+    mono = samples.ndim == 1
+    x = samples.reshape(len(samples), -1).astype(np.float64)
+    if samples.dtype == np.int16:
+        x /= 32768
+
+    chain = MasteringChain(sample_rate, preset_info)
+    chunks = [chain.process(x[start:start + chunk_frames]) for start in range(0, len(x), chunk_frames)]
+    chunks.append(chain.process(x[:0], final=True))
+    y = np.concatenate(chunks)
+
+    y *= normalization_gain(peak(y), preset_info['normalization'])
+    return y[:, 0] if mono else y
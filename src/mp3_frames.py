@@ -0,0 +1,207 @@
+"""
+Frame-level MPEG Layer III handling for lossless MP3 concatenation
+
+Segments are joined by copying their frames. Gaps are filled with silent
+frames built from scratch, and volume is changed by rewriting the global_gain
+fields in each frame's side info. No audio is decoded or re-encoded.
+"""
+
+from collections import namedtuple
+
+# Bitrates in kbps by bitrate index, for Layer III
+MPEG1_BITRATES = (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320)
+MPEG2_BITRATES = (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160)
+
+# Sample rates by sample rate index; MPEG-2 halves and MPEG-2.5 quarters them
+MPEG1_SAMPLE_RATES = (44100, 48000, 32000)
+
+# Version bits of the frame header
+MPEG25, MPEG2, MPEG1 = 0, 2, 3
+
+CHANNEL_MODE_MONO = 3
+
+# One global_gain step is 2^(1/4) in amplitude
+GLOBAL_GAIN_STEP_DB = 1.5
+
+FrameHeader = namedtuple('FrameHeader', [
+    'version',           # MPEG1, MPEG2 or MPEG25
+    'protected',         # A CRC-16 follows the header
+    'bitrate_index',
+    'sample_rate_index',
+    'padding',
+    'channel_mode',
+    'bitrate',           # kbps
+    'sample_rate',       # Hz
+    'length',            # Frame length in bytes, header included
+])
+
+
+def _crc16_table():
+    table = []
+    for byte in range(256):
+        crc = byte << 8
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x8005 if crc & 0x8000 else crc << 1) & 0xFFFF
+        table.append(crc)
+    return table
+
+
+CRC16_TABLE = _crc16_table()
+
+
+def crc16(data, crc=0xFFFF):
+    """MPEG audio CRC-16 (polynomial 0x8005, initial value 0xFFFF)"""
+    for byte in data:
+        crc = ((crc << 8) & 0xFFFF) ^ CRC16_TABLE[(crc >> 8) ^ byte]
+    return crc
+
+
+def parse_header(data, offset=0):
+    """Decode the Layer III frame header at offset
+
+    Returns:
+        FrameHeader: Or None if there is no valid, fixed-bitrate Layer III header.
+    """
+    if offset + 4 > len(data) or data[offset] != 0xFF or data[offset + 1] & 0xE0 != 0xE0:
+        return None
+    b1, b2, b3 = data[offset + 1], data[offset + 2], data[offset + 3]
+
+    version = (b1 >> 3) & 3
+    layer = (b1 >> 1) & 3
+    bitrate_index = b2 >> 4
+    sample_rate_index = (b2 >> 2) & 3
+    # Reserved version, other layers, free-format and invalid bitrates, reserved sample rate
+    if version == 1 or layer != 1 or bitrate_index in (0, 15) or sample_rate_index == 3:
+        return None
+
+    bitrate = (MPEG1_BITRATES if version == MPEG1 else MPEG2_BITRATES)[bitrate_index]
+    sample_rate = MPEG1_SAMPLE_RATES[sample_rate_index] >> {MPEG1: 0, MPEG2: 1, MPEG25: 2}[version]
+    padding = (b2 >> 1) & 1
+    length = (144000 if version == MPEG1 else 72000) * bitrate // sample_rate + padding
+
+    return FrameHeader(version, not b1 & 1, bitrate_index, sample_rate_index, padding,
+                       b3 >> 6, bitrate, sample_rate, length)
+
+
+def samples_per_frame(header):
+    return 1152 if header.version == MPEG1 else 576
+
+
+def side_info_length(header):
+    mono = header.channel_mode == CHANNEL_MODE_MONO
+    if header.version == MPEG1:
+        return 17 if mono else 32
+    return 9 if mono else 17
+
+
+def _global_gain_positions(header):
+    """Bit offsets of every global_gain field, counted from the start of the side info"""
+    channels = 1 if header.channel_mode == CHANNEL_MODE_MONO else 2
+    if header.version == MPEG1:
+        # main_data_begin(9), private bits(5 mono / 3 stereo), scfsi(4 per channel);
+        # then 2 granules x channels blocks of 59 bits
+        start = 9 + (5 if channels == 1 else 3) + 4 * channels
+        blocks, block_bits = 2 * channels, 59
+    else:
+        # main_data_begin(8), private bits(1 mono / 2 stereo); 1 granule of 63-bit blocks
+        start = 8 + channels
+        blocks, block_bits = channels, 63
+    # part2_3_length(12) and big_values(9) precede global_gain in each block
+    return [start + block * block_bits + 21 for block in range(blocks)]
+
+
+def _side_info_offset(header):
+    return 6 if header.protected else 4
+
+
+def is_info_frame(frame, header):
+    """Xing/Info (LAME) or VBRI header frames describe the original file and carry no audio"""
+    offset = _side_info_offset(header) + side_info_length(header)
+    return frame[offset:offset + 4] in (b'Xing', b'Info') or frame[36:40] == b'VBRI'
+
+
+def strip_tags(data):
+    """Return the audio part of an MP3 file, without ID3v2/ID3v1 tags"""
+    start = 0
+    while data[start:start + 3] == b'ID3' and len(data) >= start + 10:
+        size = 0
+        for byte in data[start + 6:start + 10]:
+            size = (size << 7) | (byte & 0x7F)  # Syncsafe integer
+        footer = 10 if data[start + 5] & 0x10 else 0
+        start += 10 + size + footer
+
+    end = len(data)
+    if end - start >= 128 and data[end - 128:end - 125] == b'TAG':
+        end -= 128
+    return data[start:end]
+
+
+def iter_frames(data):
+    """Yield (FrameHeader, frame bytes) for every audio frame of an MP3 file
+
+    Tags and Xing/Info frames are skipped, junk between frames is resynchronized
+    past, and a truncated final frame is dropped.
+    """
+    data = strip_tags(data)
+    offset = 0
+    while offset + 4 <= len(data):
+        header = parse_header(data, offset)
+        if header is None:
+            offset = data.find(b'\xFF', offset + 1)
+            if offset < 0:
+                return
+            continue
+        frame = data[offset:offset + header.length]
+        if len(frame) < header.length:
+            return
+        if not is_info_frame(frame, header):
+            yield header, frame
+        offset += header.length
+
+
+def same_stream_format(a, b):
+    """Frames can be mixed in one stream when version, sample rate and channel count match"""
+    return (a.version == b.version and a.sample_rate == b.sample_rate
+            and (a.channel_mode == CHANNEL_MODE_MONO) == (b.channel_mode == CHANNEL_MODE_MONO))
+
+
+def adjust_global_gain(frame, header, steps):
+    """Change a frame's volume by steps of GLOBAL_GAIN_STEP_DB without decoding it
+
+    Returns:
+        bytes: The frame with every granule's global_gain shifted (clamped to 0..255)
+               and its CRC recomputed when the frame is protected.
+    """
+    if not steps:
+        return frame
+
+    side_offset = _side_info_offset(header)
+    length = side_info_length(header)
+    total_bits = length * 8
+    side_info = int.from_bytes(frame[side_offset:side_offset + length], 'big')
+
+    for position in _global_gain_positions(header):
+        shift = total_bits - position - 8
+        gain = (side_info >> shift) & 0xFF
+        new_gain = min(255, max(0, gain + steps))
+        side_info ^= (gain ^ new_gain) << shift
+
+    side_bytes = side_info.to_bytes(length, 'big')
+    if header.protected:
+        crc = crc16(side_bytes, crc16(frame[2:4]))
+        return frame[:4] + crc.to_bytes(2, 'big') + side_bytes + frame[side_offset + length:]
+    return frame[:4] + side_bytes + frame[side_offset + length:]
+
+
+def silent_frame(header):
+    """Build a frame that decodes to silence, in the format of header
+
+    All side info is zero: no main data (part2_3_length 0) and no bit reservoir
+    use (main_data_begin 0), so it never borrows bytes from neighbouring frames.
+    The frame is unprotected and unpadded, at the bitrate of header.
+    """
+    b1 = 0xE0 | (header.version << 3) | (1 << 1) | 1  # Layer III, no CRC
+    b2 = (header.bitrate_index << 4) | (header.sample_rate_index << 2)
+    b3 = header.channel_mode << 6
+    length = (144000 if header.version == MPEG1 else 72000) * header.bitrate // header.sample_rate
+    return bytes((0xFF, b1, b2, b3)) + bytes(length - 4)
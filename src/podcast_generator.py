@@ -7,16 +7,50 @@ ENHANCED VERSION - Compatible with improved SSML processor
 from .elevenlabs_client import ElevenLabsClient
 from .ssml_processor import SSMLProcessor
 from .audio_processor import AudioProcessor
+from .tts_cache import TTSCache
+from .speech_segment import SpeechSegment, parse_output_format
+from .episode_manifest import EpisodeManifest, segment_fingerprint
+from .segment_plan import PlannedSegment, SegmentPlan, LatencyHistory, find_unbalanced_tags
+from .rate_limiter import get_rate_limiter
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from types import MappingProxyType
+import logging
 import os
 import re
+import time
 
 class PodcastGenerator:
     """Main class for generating podcasts from scripts with voice-specific settings"""
     
     def __init__(self, config):
         self.config = config
-        self.elevenlabs = ElevenLabsClient(config['api_key'])
+        
+        # Optional on-disk cache so unchanged lines are not re-synthesized
+        cache_config = config.get('cache', {})
+        self.tts_cache = None
+        if cache_config.get('enabled', False):
+            self.tts_cache = TTSCache(
+                cache_config['directory'],
+                max_size_mb=cache_config.get('max_size_mb', 1024),
+                max_age_days=cache_config.get('max_age_days', 90)
+            )
+        
+        # Optional rate limiter, shared by every client in this process using the same API key
+        rate_limit_config = dict(config.get('rate_limit', {}))
+        self.rate_limiter = None
+        if rate_limit_config.pop('enabled', False):
+            self.rate_limiter = get_rate_limiter(config['api_key'], **rate_limit_config)
+        
+        self.elevenlabs = ElevenLabsClient(
+            config['api_key'],
+            cache=self.tts_cache,
+            rate_limiter=self.rate_limiter,
+            output_format=config['audio'].get('output_format', 'mp3_44100_128'),
+            streaming=config['audio'].get('streaming', False),
+            optimize_streaming_latency=config['audio'].get('optimize_streaming_latency', 0),
+            **config.get('http', {})
+        )
         
         # Initialize SSML processor with detailed logging option
         enable_ssml_logging = config.get('enable_detailed_logging', False)
@@ -25,7 +59,18 @@ class PodcastGenerator:
             enable_detailed_logging=enable_ssml_logging
         )
         
-        self.audio_processor = AudioProcessor()
+        self.audio_processor = AudioProcessor(
+            engine=config['podcast'].get('assembly_engine', 'numpy'),
+            decode_workers=config['podcast'].get('decode_workers', 0)
+        )
+        
+        # Measured request latencies, used by dry_run to estimate render time
+        self.latency_history = LatencyHistory(config['podcast'].get('latency_history'))
+        
+        # Codec and sample rate of the segments the API returns
+        self.segment_codec, self.segment_sample_rate, _ = parse_output_format(
+            config['audio'].get('output_format', 'mp3_44100_128')
+        )
         
         # Voice mapping
         self.voices = config['voices']
@@ -38,6 +83,8 @@ class PodcastGenerator:
         print(f"✓ Voice aliases: {self.voice_aliases}")
         if enable_ssml_logging:
             print(f"📋 SSML detailed logging: ENABLED")
+        if self.tts_cache:
+            print(f"♻️ TTS segment cache: {self.tts_cache.cache_dir}")
     
     def _setup_logging(self, output_name):
         """Setup logging for this podcast generation session"""
@@ -60,7 +107,8 @@ class PodcastGenerator:
         log_file = log_dir / log_filename
         
         # Setup logger
-        logger = logging.getLogger(f"podcast_{timestamp}")
+        # Episode name keeps loggers apart when a batch starts several episodes per second
+        logger = logging.getLogger(f"podcast_{episode_name}_{timestamp}")
         logger.setLevel(logging.DEBUG)
         logger.handlers.clear()
         
@@ -90,34 +138,29 @@ class PodcastGenerator:
         default_voice = list(self.voices.keys())[0]
         return self.voices[default_voice], default_voice
     
-    def _process_speaker_line(self, line, line_number, actual_voice_name):
-        """Enhanced processing of a speaker line with multi-emotion support"""
+    def _process_speaker_line(self, text, line_number, actual_voice_name):
+        """Enhanced processing of a speaker line with multi-emotion support
+        
+        Returns:
+            tuple: (emotions_found, final_settings, processed_text) from a single tokenizer pass.
+        """
+        logger = self.logger or logging.getLogger(__name__)
         
-        # Extract all emotions from the line
-        emotions_found = self.ssml_processor.extract_all_emotions(line)
+        emotions_found, final_settings, processed_text = self.ssml_processor.analyze_line(text, actual_voice_name)
         
         # Check for multi-emotion scenarios
         if len(emotions_found) > 1:
-            self.logger.info(f"MULTI-EMOTION LINE DETECTED at line {line_number}: {emotions_found}")
+            logger.info(f"MULTI-EMOTION LINE DETECTED at line {line_number}: {emotions_found}")
             print(f"🎭 Multi-emotion detected: {emotions_found}")
             
             # For now, use primary emotion but log the complexity
             primary_emotion = emotions_found[0]
-            self.logger.warning(f"Using primary emotion {primary_emotion} for complex line")
+            logger.warning(f"Using primary emotion {primary_emotion} for complex line")
             
             # Future enhancement: could split into segments here
             # segments = self.ssml_processor.process_text_with_emotion_splits(line, actual_voice_name)
         
-        # Get emotion settings using enhanced method
-        emotion_settings = self.ssml_processor.extract_emotion(line, actual_voice_name)
-        
-        # Get default voice settings
-        default_settings = self.ssml_processor.get_default_voice_settings(actual_voice_name)
-        
-        # Merge settings (emotion overrides defaults)
-        final_settings = {**default_settings, **emotion_settings}
-        
-        return emotions_found, final_settings
+        return emotions_found, final_settings, processed_text
     
     def _parse_speaker_line(self, line):
         """Parse speaker line and extract speaker name and text"""
@@ -151,32 +194,26 @@ class PodcastGenerator:
         
         return False
     
-    def create_podcast(self, script, output_name, temp_file_folder):
-        """Create complete podcast from script with enhanced voice-specific settings"""
-        # Setup logging for this session
-        logger, log_file = self._setup_logging(output_name)
-        self.logger = logger  # Store for use in other methods
+    def compile_script(self, script):
+        """Compile a script into an immutable SegmentPlan without calling the API
         
-        audio_files = []
-        temp_files = []
-        pause_indices = []
+        Resolves voices, merges emotion settings and processes SSML for every line.
+        Unknown voices and unbalanced (tag)/(/tag) pairs are reported in plan.issues.
         
-        # Ensure output directory exists if we have project info
-        if hasattr(self, 'output_dir'):
-            import os
-            os.makedirs(self.output_dir, exist_ok=True)
-            # Make output path relative to output directory
-            if not os.path.isabs(output_name):
-                output_name = os.path.join(self.output_dir, output_name)
+        Args:
+            script (str or list): The podcast script, or its preprocessed lines.
         
-        logger.info(f"Starting podcast generation: {output_name}")
-        logger.info(f"Script length: {len(script)} characters")
+        Returns:
+            SegmentPlan: The planned segments in episode order.
+        """
+        logger = self.logger or logging.getLogger(__name__)
+        script_lines = self._preprocess_script(script) if isinstance(script, str) else script
+        model_id = self.config['audio']['model']
+        output_format = self.config['audio'].get('output_format', 'mp3_44100_128')
         
-        # Enhanced script preprocessing
-        script_lines = self._preprocess_script(script)
-        logger.info(f"Processed script into {len(script_lines)} segments")
-        
-        segment_count = 0
+        segments = []
+        pause_markers = []
+        issues = []
         
         for i, line in enumerate(script_lines):
             # Skip lines that shouldn't be processed
@@ -185,8 +222,10 @@ class PodcastGenerator:
             
             # Handle special pause markers
             if '[PAUZE]' in line or '(lange stilte)' in line:
-                pause_indices.append(segment_count - 1)
-                logger.info(f"Added pause marker after segment {segment_count - 1}")
+                pause_markers.append(len(segments))
+                if segments:
+                    segments[-1] = segments[-1]._replace(pause_after=True)
+                logger.info(f"Added pause marker after job {len(segments) - 1}")
                 continue
             
             # Parse speaker line
@@ -194,16 +233,19 @@ class PodcastGenerator:
             
             if not speaker_name or not text:
                 logger.warning(f"Could not parse line {i}: {line}")
+                issues.append(f"line {i}: could not parse '{line[:60]}'")
                 continue
             
+            if speaker_name not in self.voices and self.voice_aliases.get(speaker_name) not in self.voices:
+                issues.append(f"line {i}: unknown voice '{speaker_name}'")
+            for problem in find_unbalanced_tags(text):
+                issues.append(f"line {i}: {problem}")
+            
             # Resolve voice ID and name
             voice_id, actual_voice_name = self._resolve_voice_id(speaker_name)
             
-            # Enhanced processing with multi-emotion support
-            emotions_found, final_settings = self._process_speaker_line(line, i, actual_voice_name)
-            
-            # Process SSML markup with enhanced processor
-            processed_text = self.ssml_processor.process_text(text, actual_voice_name)
+            # Emotions, merged settings and SSML from one pass over the line
+            emotions_found, final_settings, processed_text = self._process_speaker_line(text, i, actual_voice_name)
             
             # Enhanced logging entry
             log_entry = f"""
@@ -224,57 +266,415 @@ Voice ID: {voice_id}
             print(f"📝 Processing: '{processed_text[:60]}{'...' if len(processed_text) > 60 else ''}'")
             
             if processed_text:
-                file = os.path.join(temp_file_folder, f"temp_{actual_voice_name}_{segment_count}.mp3")
-                
-                # Enhanced API call logging
-                api_log = f"""
+                segments.append(PlannedSegment(
+                    index=len(segments),
+                    line_number=i,
+                    speaker=speaker_name,
+                    voice_name=actual_voice_name,
+                    voice_id=voice_id,
+                    text=processed_text,
+                    settings=MappingProxyType(dict(final_settings)),
+                    emotions=tuple(emotions_found),
+                    characters=len(processed_text),
+                    pause_after=False,
+                    fingerprint=segment_fingerprint(processed_text, voice_id, model_id, final_settings, output_format)
+                ))
+        
+        return SegmentPlan(segments, pause_markers, issues)
+    
+    def _plan_segments(self, script_lines, temp_file_folder=None):
+        """Turn the compiled plan into mutable TTS jobs for one render
+        
+        Segment files are only planned when temp_file_folder is given (keep-segments mode).
+        
+        Returns:
+            tuple: (jobs, pause_markers) where each pause marker is the number of
+                   jobs planned before the [PAUZE] line.
+        """
+        plan = self.compile_script(script_lines)
+        for issue in plan.issues:
+            self.logger.warning(issue)
+            print(f"⚠️ {issue}")
+        
+        jobs = []
+        for segment in plan:
+            job = segment._asdict()
+            job['settings'] = dict(segment.settings)
+            job['emotions'] = list(segment.emotions)
+            job['file'] = (os.path.join(temp_file_folder,
+                                        f"temp_{segment.voice_name}_{segment.index}.{self.segment_codec}")
+                           if temp_file_folder else None)
+            jobs.append(job)
+        
+        return jobs, list(plan.pause_markers)
+    
+    def dry_run(self, script, max_concurrent_requests=None):
+        """Compile a script and report its cost and expected render time without calling the API
+        
+        Args:
+            script (str): The podcast script.
+            max_concurrent_requests (int, optional): Concurrency to estimate for.
+                                                     Defaults to [podcast] max_concurrent_requests.
+        
+        Returns:
+            dict: Segment count, total/cached/billable characters, characters per uncached
+                  request, estimated seconds and issues.
+        """
+        if max_concurrent_requests is None:
+            max_concurrent_requests = self.config['podcast'].get('max_concurrent_requests', 1)
+        
+        plan = self.compile_script(script)
+        
+        # Lines already in the TTS cache are free and near-instant
+        uncached = [segment for segment in plan
+                    if not (self.tts_cache and self.tts_cache.contains(segment.fingerprint))]
+        billable = sum(segment.characters for segment in uncached)
+        estimated_seconds = self.latency_history.estimate_wall_time(
+            [segment.characters for segment in uncached], max_concurrent_requests
+        )
+        
+        print(f"🧾 Dry run: {len(plan)} segments, {len(plan.pause_markers)} pauses")
+        for voice_name, characters in plan.characters_by_voice().items():
+            print(f"   {voice_name}: {characters:,} characters")
+        print(f"💶 Billable characters: {billable:,} of {plan.total_characters:,} "
+              f"({len(plan) - len(uncached)} segments cached)")
+        print(f"⏱️ Estimated synthesis time: ~{estimated_seconds:.0f}s "
+              f"with {max_concurrent_requests} concurrent requests "
+              f"({len(self.latency_history.samples)} latency samples)")
+        for issue in plan.issues:
+            print(f"⚠️ {issue}")
+        
+        return {
+            "segments": len(plan),
+            "total_characters": plan.total_characters,
+            "cached_characters": plan.total_characters - billable,
+            "billable_characters": billable,
+            "request_characters": [segment.characters for segment in uncached],
+            "estimated_seconds": estimated_seconds,
+            "issues": list(plan.issues)
+        }
+    
+    def _synthesize_segment(self, job, logger=None, manifest=None):
+        """Run one TTS job; returns a SpeechSegment or None on failure
+        
+        Args:
+            job (dict): Segment job from _plan_segments.
+            logger (logging.Logger, optional): Episode log; defaults to the current session's.
+            manifest (EpisodeManifest, optional): Checkpoint manifest of the job's episode.
+        """
+        logger = logger or self.logger
+        
+        # Enhanced API call logging
+        api_log = f"""
 === ELEVENLABS API CALL ===
-Text sent to API: {processed_text}
-Voice ID: {voice_id}
+Text sent to API: {job['text']}
+Voice ID: {job['voice_id']}
 Model: {self.config['audio']['model']}
-Voice settings: {final_settings}
-Output file: {file}
-Emotions applied: {emotions_found}
+Voice settings: {job['settings']}
+Output file: {job['file'] or 'in memory'}
+Emotions applied: {job['emotions']}
 ===========================
 """
-                logger.info(api_log)
-                
-                # Enhanced console output for API call
-                settings_summary = f"stability={final_settings.get('stability', 0.7):.2f}, style={final_settings.get('style', 0.4):.2f}"
-                print(f"🔊 TTS with {settings_summary}")
-                
-                result = self.elevenlabs.text_to_speech(
-                    processed_text, 
-                    voice_id, 
-                    file, 
-                    final_settings,
-                    self.config['audio']['model']
-                )
-                
-                if result:
-                    audio_files.append(file)
-                    temp_files.append(file)
-                    segment_count += 1
-                    
-                    # Get file size for detailed logging
+        logger.info(api_log)
+        
+        # Enhanced console output for API call
+        settings_summary = f"stability={job['settings'].get('stability', 0.7):.2f}, style={job['settings'].get('style', 0.4):.2f}"
+        print(f"🔊 TTS with {settings_summary} (segment {job['index']})")
+        
+        cached = self.tts_cache is not None and self.tts_cache.contains(job['fingerprint'])
+        started = time.monotonic()
+        audio = self.elevenlabs.synthesize(
+            job['text'],
+            job['voice_id'],
+            job['settings'],
+            self.config['audio']['model']
+        )
+        
+        if not audio:
+            return None
+        if not cached:
+            self.latency_history.record(len(job['text']), time.monotonic() - started)
+        
+        segment = SpeechSegment(
+            job['index'],
+            job['voice_name'],
+            audio,
+            audio_format=self.segment_codec,
+            text=job['text'],
+            sample_rate=self.segment_sample_rate
+        )
+        
+        # Only touch the disk when segments are kept for debugging or checkpointing
+        if job['file']:
+            segment.save(job['file'])
+            if manifest is not None:
+                manifest.record(job, segment)
+        
+        logger.info(f"SUCCESS: Generated {segment}")
+        print(f"✅ Generated segment {job['index']}")
+        
+        return segment
+    
+    def _synthesize_segments(self, jobs, max_concurrent_requests=1, logger=None, manifest=None):
+        """Synthesize all jobs, optionally with several requests in flight
+        
+        Returns:
+            tuple: (results, failures) where results maps job index to a SpeechSegment
+                   (or None) and failures maps job index to an error description.
+        """
+        results = {}
+        failures = {}
+        
+        if max_concurrent_requests <= 1 or len(jobs) <= 1:
+            for job in jobs:
+                try:
+                    results[job['index']] = self._synthesize_segment(job, logger, manifest)
+                except Exception as e:
+                    results[job['index']] = None
+                    failures[job['index']] = str(e)
+        else:
+            # Longest lines first so the slowest requests don't form a tail at the end
+            schedule = sorted(jobs, key=lambda job: len(job['text']), reverse=True)
+            print(f"⚡ Synthesizing {len(jobs)} segments with up to {max_concurrent_requests} concurrent requests")
+            
+            with ThreadPoolExecutor(max_workers=max_concurrent_requests) as executor:
+                futures = {executor.submit(self._synthesize_segment, job, logger, manifest): job for job in schedule}
+                for future in as_completed(futures):
+                    job = futures[future]
                     try:
-                        file_size = os.path.getsize(file)
-                        logger.info(f"SUCCESS: Created {file} ({file_size:,} bytes)")
-                        print(f"✅ Generated segment {segment_count}")
-                    except:
-                        logger.info(f"SUCCESS: Created {file}")
-                        print(f"✅ Generated segment {segment_count}")
-                else:
-                    error_msg = f"FAILED: TTS conversion for line {i}: {processed_text[:50]}..."
-                    logger.error(error_msg)
-                    print(f"❌ {error_msg}")
+                        results[job['index']] = future.result()
+                    except Exception as e:
+                        results[job['index']] = None
+                        failures[job['index']] = str(e)
+        
+        for job in jobs:
+            if not results.get(job['index']) and job['index'] not in failures:
+                failures[job['index']] = "TTS conversion returned no audio"
+        
+        return results, failures
+    
+    def _reuse_checkpointed_segments(self, jobs, previous, manifest):
+        """Reuse segments of a previous render whose content is unchanged
+        
+        Lines are matched on their fingerprint (text, voice, settings, model and
+        format), not their position, so inserting or moving lines does not
+        invalidate the rest of the episode. The manifest is rebuilt, reused audio is
+        moved to this render's segment file names, and files of lines that no
+        longer exist are removed.
+        
+        Args:
+            jobs (list): Segment jobs of the current script.
+            previous (EpisodeManifest): Manifest of the previous render.
+            manifest (EpisodeManifest): Manifest of this render.
+        
+        Returns:
+            dict: job index -> SpeechSegment for every reused segment.
+        """
+        available = previous.files_by_fingerprint()
+        
+        # Read everything first: writing under the new names may overwrite old files
+        reused = {}
+        audio_by_file = {}
+        for job in jobs:
+            file_path = available.get(job['fingerprint'])
+            if not file_path:
+                continue
+            if file_path not in audio_by_file:
+                with open(file_path, "rb") as f:
+                    audio_by_file[file_path] = f.read()
+            reused[job['index']] = SpeechSegment(
+                job['index'],
+                job['voice_name'],
+                audio_by_file[file_path],
+                audio_format=self.segment_codec,
+                text=job['text'],
+                file_path=file_path,
+                sample_rate=self.segment_sample_rate
+            )
+        
+        # Write moved audio under temp names and only rename it into place once the
+        # new manifest is saved: until then the old manifest still describes the old
+        # files. A crash in between leaves files whose hash no longer matches the new
+        # manifest, so they are synthesized again instead of being reused wrongly.
+        moves = []
+        for job in jobs:
+            segment = reused.get(job['index'])
+            if segment is None:
+                continue
+            if segment.file_path != job['file']:
+                temp_path = f"{job['file']}.tmp"
+                segment.save(temp_path)
+                segment.file_path = job['file']
+                moves.append((temp_path, job['file']))
+            manifest.record(job, segment, save=False)
+        manifest.save()
+        for temp_path, file_path in moves:
+            os.replace(temp_path, file_path)
+        
+        current_files = {job['file'] for job in jobs}
+        for file_path in previous.files() - current_files:
+            if os.path.exists(file_path):
+                os.remove(file_path)
+        
+        return reused
+    
+    def create_podcast(self, script, output_name, temp_file_folder=None, max_concurrent_requests=None,
+                       keep_segments=None, checkpoint=None, resume=False):
+        """Create complete podcast from script with enhanced voice-specific settings
+        
+        Segments are handed to the audio processor in memory; they are only written
+        to temp_file_folder when keep_segments is set.
+        
+        Args:
+            script (str): The podcast script.
+            output_name (str): Output name without extension.
+            temp_file_folder (str, optional): Folder for kept segment files.
+                                              Defaults to "<output_name>_segments".
+            max_concurrent_requests (int, optional): Number of TTS requests in flight at once.
+                                                     Defaults to [podcast] max_concurrent_requests.
+            keep_segments (bool, optional): Also write every segment to disk for debugging.
+                                            Defaults to [podcast] keep_segments.
+            checkpoint (bool, optional): Keep segments on disk and record each one in a manifest
+                                         so an interrupted render can be resumed.
+                                         Defaults to [podcast] checkpoint.
+            resume (bool, optional): Reuse every segment checkpointed by a previous render of this
+                                     episode whose line is unchanged, so only interrupted, inserted
+                                     or edited lines are synthesized. Implies checkpoint.
+        """
+        if max_concurrent_requests is None:
+            max_concurrent_requests = self.config['podcast'].get('max_concurrent_requests', 1)
+        
+        episode = self.prepare_episode(script, output_name, temp_file_folder, keep_segments, checkpoint, resume)
+        results, failures = self._synthesize_segments(
+            episode['pending_jobs'], max_concurrent_requests, episode['logger'], episode['manifest']
+        )
+        return self.assemble_episode(episode, results, failures)
+    
+    def prepare_episode(self, script, output_name, temp_file_folder=None, keep_segments=None,
+                        checkpoint=None, resume=False):
+        """Set up logging and checkpointing for one episode and plan its segment jobs
+        
+        Arguments are as for create_podcast.
+        
+        Returns:
+            dict: Episode state with output_name, logger, log_file, manifest, jobs,
+                  pause_markers, reused (job index -> SpeechSegment) and pending_jobs.
+        """
+        # Setup logging for this session
+        logger, log_file = self._setup_logging(output_name)
+        self.logger = logger  # Store for use in other methods
+        
+        if keep_segments is None:
+            keep_segments = self.config['podcast'].get('keep_segments', False)
+        if checkpoint is None:
+            checkpoint = self.config['podcast'].get('checkpoint', False)
+        checkpoint = checkpoint or resume
+        
+        # Ensure output directory exists if we have project info
+        if hasattr(self, 'output_dir'):
+            os.makedirs(self.output_dir, exist_ok=True)
+            # Make output path relative to output directory
+            if not os.path.isabs(output_name):
+                output_name = os.path.join(self.output_dir, output_name)
+        
+        logger.info(f"Starting podcast generation: {output_name}")
+        logger.info(f"Script length: {len(script)} characters")
+        
+        # Enhanced script preprocessing
+        script_lines = self._preprocess_script(script)
+        logger.info(f"Processed script into {len(script_lines)} segments")
+        
+        if keep_segments or checkpoint:
+            temp_file_folder = temp_file_folder or f"{output_name}_segments"
+            os.makedirs(temp_file_folder, exist_ok=True)
+            logger.info(f"Keeping segment files in: {temp_file_folder}")
+        else:
+            temp_file_folder = None
+        
+        manifest = None
+        if checkpoint:
+            manifest_path = os.path.join(temp_file_folder, "manifest.json")
+            manifest = EpisodeManifest(manifest_path, Path(output_name).name)
+            logger.info(f"Checkpoint manifest: {manifest_path}")
+        
+        jobs, pause_markers = self._plan_segments(script_lines, temp_file_folder)
+        
+        reused = {}
+        if resume:
+            previous = EpisodeManifest.load(manifest.path, manifest.episode)
+            reused = self._reuse_checkpointed_segments(jobs, previous, manifest)
+            current = {job['fingerprint'] for job in jobs}
+            removed = sum(1 for entry in previous.segments.values() if entry.get('fingerprint') not in current)
+            message = (f"Re-render: reusing {len(reused)} of {len(jobs)} segments, "
+                       f"{len(jobs) - len(reused)} new or changed, {removed} no longer used")
+            logger.info(message)
+            print(f"♻️ {message}")
+        
+        return {
+            'output_name': output_name,
+            'logger': logger,
+            'log_file': log_file,
+            'manifest': manifest,
+            'jobs': jobs,
+            'pause_markers': pause_markers,
+            'reused': reused,
+            'pending_jobs': [job for job in jobs if job['index'] not in reused]
+        }
+    
+    def assemble_episode(self, episode, results, failures):
+        """Combine the segments of a fully synthesized episode into the output file
+        
+        Args:
+            episode (dict): Episode state from prepare_episode.
+            results (dict): job index -> SpeechSegment (or None) for the pending jobs.
+            failures (dict): job index -> error description.
+        
+        Returns:
+            str: Path of the output file, or None on failure.
+        """
+        logger = episode['logger']
+        log_file = episode['log_file']
+        output_name = episode['output_name']
+        jobs = episode['jobs']
+        pause_markers = episode['pause_markers']
+        results = dict(results)
+        results.update(episode['reused'])
         
-        if not audio_files:
-            error_msg = "No audio files generated!"
+        try:
+            self.latency_history.save()
+        except OSError as e:
+            logger.warning(f"Could not save latency history: {e}")
+        
+        # Collect successful segments in script order
+        audio_segments = []
+        successes_before = []  # successes_before[n] = successful segments among the first n jobs
+        for job in jobs:
+            successes_before.append(len(audio_segments))
+            if results.get(job['index']):
+                audio_segments.append(results[job['index']])
+        successes_before.append(len(audio_segments))
+        segment_count = len(audio_segments)
+        
+        # A pause follows the last segment that succeeded before its [PAUZE] marker
+        pause_indices = [successes_before[jobs_before] - 1 for jobs_before in pause_markers]
+        
+        for job in jobs:
+            if job['index'] in failures:
+                error_msg = (f"FAILED: TTS conversion for line {job['line_number']} "
+                             f"({job['speaker']}): {job['text'][:50]}... - {failures[job['index']]}")
+                logger.error(error_msg)
+                print(f"❌ {error_msg}")
+        if failures:
+            print(f"⚠️ {len(failures)} of {len(jobs)} segments failed and will be missing from the episode")
+        
+        if not audio_segments:
+            error_msg = "No audio segments generated!"
             logger.error(error_msg)
             print(f"❌ {error_msg}")
             return None
         
+        export_format = self.config['podcast'].get('export_format', 'mp3')
+        
         # Get voice-specific volume adjustments
         voice_volumes = {}
         for voice_name in self.voices.keys():
@@ -283,24 +683,24 @@ Emotions applied: {emotions_found}
         # Enhanced audio combination logging
         audio_log = f"""
 === AUDIO COMBINATION ===
-Audio files: {audio_files}
+Audio segments: {audio_segments}
 Voice volumes: {voice_volumes}
 Pause indices: {pause_indices}
-Final output: {output_name}.mp3
-Total segments: {len(audio_files)}
+Final output: {output_name}.{export_format}
+Total segments: {len(audio_segments)}
 =========================
 """
         logger.info(audio_log)
         
-        print(f"🎵 Combining {len(audio_files)} audio segments...")
+        print(f"🎵 Combining {len(audio_segments)} audio segments...")
         
         # Combine all audio files with smart gaps and voice-specific volumes
-        output_file = f"{output_name}.mp3"
+        output_file = f"{output_name}.{export_format}"
         
         # Check if audio_processor supports voice_volumes
         try:
             result = self.audio_processor.combine_audio_segments(
-                audio_files, 
+                audio_segments, 
                 output_file, 
                 pause_indices=pause_indices,
                 voice_volumes=voice_volumes,
@@ -313,7 +713,7 @@ Total segments: {len(audio_files)}
             logger.warning(fallback_msg)
             print(f"⚠️ {fallback_msg}")
             result = self.audio_processor.combine_audio_segments(
-                audio_files, 
+                audio_segments, 
                 output_file, 
                 pause_indices=pause_indices,
                 normal_gap=int(self.config['podcast']['default_pause_duration'] * 1000),
@@ -324,13 +724,12 @@ Total segments: {len(audio_files)}
         if result:
             # Get final file size and duration info
             try:
-                import os
                 if os.path.exists(result):
                     file_size = os.path.getsize(result)
                     success_msg = f"SUCCESS: Generated {result} ({file_size:,} bytes)"
                     
                     # Estimate duration (rough calculation)
-                    estimated_duration = len(audio_files) * 3  # Rough estimate of 3 seconds per segment
+                    estimated_duration = len(audio_segments) * 3  # Rough estimate of 3 seconds per segment
                     success_msg += f", estimated duration: ~{estimated_duration}s"
                 else:
                     success_msg = f"SUCCESS: Generated {result}"
@@ -344,6 +743,21 @@ Total segments: {len(audio_files)}
             print(f"📊 Processed {segment_count} segments total")
             print(f"📋 Detailed log saved to: {log_file}")
             
+            if self.tts_cache:
+                cache_stats = self.tts_cache.get_stats()
+                logger.info(f"TTS cache stats: {cache_stats}")
+                print(f"♻️ Cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses")
+            
+            ssml_cache_stats = self.ssml_processor.get_cache_stats()
+            if ssml_cache_stats:
+                logger.info(f"SSML cache stats: {ssml_cache_stats}")
+            
+            if self.rate_limiter:
+                limiter_stats = self.rate_limiter.get_stats()
+                logger.info(f"Rate limiter stats: {limiter_stats}")
+                print(f"🚦 Rate limiter: concurrency {limiter_stats['concurrency_limit']}, "
+                      f"{limiter_stats['throttled_requests']} throttled of {limiter_stats['total_requests']} requests")
+            
             # Summary of emotions used
             if hasattr(self.ssml_processor, 'detailed_logging') and self.ssml_processor.detailed_logging:
                 print(f"📝 Check log for detailed SSML processing information")
@@ -374,5 +788,8 @@ Total segments: {len(audio_files)}
         return {
             "voices_used": list(self.voices.keys()),
             "voice_aliases": self.voice_aliases,
-            "ssml_detailed_logging": hasattr(self.ssml_processor, 'detailed_logging')
+            "ssml_detailed_logging": hasattr(self.ssml_processor, 'detailed_logging'),
+            "tts_cache": self.tts_cache.get_stats() if self.tts_cache else None,
+            "ssml_cache": self.ssml_processor.get_cache_stats(),
+            "rate_limiter": self.rate_limiter.get_stats() if self.rate_limiter else None
         }
\ No newline at end of file
@@ -8,28 +8,199 @@ Inspired by Elliot Williams' Hackaday Podcast workflow.
 Usage:
     python podcast_postprocessor.py input.mp3 [output.mp3]
     python podcast_postprocessor.py --analyze input.mp3
-    python podcast_postprocessor.py --batch directory/
+    python podcast_postprocessor.py --batch directory/ [--jobs N]
 """
 
+import hashlib
 import os
-import sys
+import re
 import subprocess
 import shutil
+import tempfile
+import io
+from contextlib import nullcontext, redirect_stdout
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 import argparse
 import json
+import wave
 from datetime import datetime
 
+try:
+    from . import mastering_dsp
+except ImportError:
+    try:
+        import mastering_dsp  # Run as a script from src/
+    except ImportError:
+        mastering_dsp = None  # numpy not installed; the numpy engine is unavailable
+
+# sox: decode, SoX chain and encode with temp WAV files in between
+# ffmpeg: the same chain as one ffmpeg filtergraph in a single process
+# pipe: the SoX chain between ffmpeg decoder and encoder, connected by pipes
+# numpy: the chain in-process (mastering_dsp), streamed in chunks; needs no SoX
+MASTERING_ENGINES = ("sox", "ffmpeg", "pipe", "numpy")
+
+MASTERING_SAMPLE_RATE = 44100
+
+MASTERING_STEPS = [
+    "Noise gate (silence/noise removal)",
+    "High-pass filter (remove rumble/DC offset)",
+    "Compression (dynamic range control)",
+    "EQ (frequency balancing)",
+    "De-esser (reduce harsh 's' sounds for Dutch speech)",
+    "Limiting (prevent clipping)",
+    "Safety limiter (final clip protection)",
+    "Normalization (optimal loudness)"
+]
+
+# Bump whenever a mastering chain changes in a way that changes its output,
+# so batch runs re-master files that the manifest considers up to date
+MASTERING_CHAIN_VERSION = 3
+
+# Appended to an ffmpeg run to measure peak/RMS (astats) and EBU R128 loudness (ebur128)
+# while it decodes or encodes; the results are printed to stderr when the run ends
+ANALYSIS_FILTERS = "astats=metadata=0,ebur128=peak=true:framelog=verbose"
+
+# What the SoX "compression" stage does per compression level: its compand transfer
+# curves map every level to itself, so only this static gain (dB) changes the audio
+COMPRESSION_GAIN_DB = {
+    "light": -3,
+    "medium": -6,
+    "heavy": -8,
+}
+
+# Ceiling of the SoX safety limiter (compand ... 0,-3), in dBFS before normalization
+SAFETY_LIMIT_DB = -3
+
+class MasteringManifest:
+    """
+    Records what batch_process produced, so unchanged files are not mastered again.
+
+    Entries are keyed by input path relative to the batch input directory and hold a
+    fingerprint of the input content, preset, engine and chain version, plus the output
+    path (relative to the manifest) and its analysis metrics. The manifest is rewritten
+    atomically after each file.
+    """
+
+    VERSION = 1
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.files = {}  # relative input path -> entry
+
+    @classmethod
+    def load(cls, path):
+        """Load a manifest from disk; a missing or unreadable file gives an empty manifest."""
+        manifest = cls(path)
+        if not manifest.path.exists():
+            return manifest
+
+        try:
+            with open(manifest.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"⚠️ Ignoring unreadable mastering manifest {path}: {e}")
+            return manifest
+
+        if data.get("version") == cls.VERSION:
+            manifest.files = data.get("files", {})
+        return manifest
+
+    def save(self):
+        """Write the manifest atomically (temp file + rename)."""
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": self.VERSION, "files": self.files}, f, ensure_ascii=False, indent=2)
+        os.replace(temp_path, self.path)
+
+    def content_hash(self, key, input_file):
+        """
+        SHA-256 of a file's content.
+
+        The hash recorded for the same path is reused while size and modification
+        time are unchanged, so unchanged archives are not read in full every run.
+        """
+        stat = input_file.stat()
+        entry = self.files.get(key, {})
+        if entry.get("input_size") == stat.st_size and entry.get("input_mtime_ns") == stat.st_mtime_ns:
+            return entry["input_sha256"]
+
+        digest = hashlib.sha256()
+        with open(input_file, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    @staticmethod
+    def fingerprint(content_hash, preset_name, preset_info, engine):
+        """Hash of everything that determines a mastered file."""
+        key = json.dumps({
+            "input": content_hash,
+            "preset": preset_name,
+            "settings": preset_info,
+            "engine": engine,
+            "chain_version": MASTERING_CHAIN_VERSION
+        }, sort_keys=True)
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    def output_path(self, entry):
+        return self.path.parent / entry.get("output", "")
+
+    def up_to_date(self, key, fingerprint):
+        """
+        Get the entry for key if it was mastered with this fingerprint and its output is intact.
+
+        Returns:
+            dict: The manifest entry, or None if the file has to be mastered.
+        """
+        entry = self.files.get(key)
+        if not entry or entry.get("fingerprint") != fingerprint:
+            return None
+        output = self.output_path(entry)
+        if not output.is_file() or output.stat().st_size != entry.get("output_size"):
+            return None
+        return entry
+
+    def record(self, key, input_file, content_hash, fingerprint, output_file, metrics, save=True):
+        """Remember one successfully mastered file."""
+        stat = input_file.stat()
+        self.files[key] = {
+            "input_sha256": content_hash,
+            "input_size": stat.st_size,
+            "input_mtime_ns": stat.st_mtime_ns,
+            "fingerprint": fingerprint,
+            "output": Path(os.path.relpath(output_file, self.path.parent)).as_posix(),
+            "output_size": Path(output_file).stat().st_size,
+            "metrics": metrics,
+            "mastered_at": datetime.now().isoformat(timespec="seconds")
+        }
+        if save:
+            self.save()
+
+
 class PodcastPostProcessor:
     """Professional podcast post-processing with SoX mastering chain"""
 
-    def __init__(self, enable_mastering=True, quality_preset="podcast", debug=False):
+    def __init__(self, enable_mastering=True, quality_preset="podcast", debug=False, engine="sox"):
+        """
+        Args:
+            enable_mastering (bool): False copies files instead of mastering them.
+            quality_preset (str): Default preset name.
+            debug (bool): Print the full commands and tool output.
+            engine (str): One of MASTERING_ENGINES. "ffmpeg" needs no SoX and writes no temp files;
+                          "numpy" needs no SoX either and is used when SoX is not found.
+        """
+        if engine not in MASTERING_ENGINES:
+            raise ValueError(f"Unknown mastering engine '{engine}', expected one of {MASTERING_ENGINES}")
         self.enable_mastering = enable_mastering
         self.quality_preset = quality_preset
         self.debug = debug
+        self.engine = engine
         
         self.temp_dir = Path("temp_mastering")
         self.temp_dir.mkdir(exist_ok=True)
+        self.last_error = None  # Why the last apply_mastering_chain fell back to a copy, if it did
+        self.last_metrics = None  # Analysis measured during the last mastering encode, if any
 
         self.presets = {
             "podcast": {
@@ -37,28 +208,32 @@ class PodcastPostProcessor:
                 "description": "Optimized for speech, broadcast-ready",
                 "mp3_bitrate": "192k",
                 "normalization": "-3", # dB value, gives -3dB peak level
-                "compression": "medium"
+                "compression": "medium",
+                "loudness": "-16" # LUFS target of the ffmpeg engine, common podcast level
             },
             "audiobook": {
                 "name": "Audiobook Quality",
                 "description": "High quality for long listening with balanced dynamics",
                 "mp3_bitrate": "128k",
                 "normalization": "-3", # Conservative for long listening
-                "compression": "heavy"
+                "compression": "heavy",
+                "loudness": "-19" # Quieter for long listening
             },
             "broadcast": {
                 "name": "Broadcast Standard",
                 "description": "Radio/TV broadcast ready with higher loudness",
                 "mp3_bitrate": "320k",
                 "normalization": "-1", # Louder for broadcast
-                "compression": "light"
+                "compression": "light",
+                "loudness": "-14" # Louder for broadcast
             },
             "voice_only": {
                 "name": "Voice Only",
                 "description": "Maximum intelligibility with strong compression",
                 "mp3_bitrate": "128k",
                 "normalization": "-1", # Can be louder since it's heavily compressed
-                "compression": "heavy"
+                "compression": "heavy",
+                "loudness": "-14" # Loud, heavily compressed speech
             }
         }
 
@@ -74,6 +249,10 @@ class PodcastPostProcessor:
             print("🚫 Mastering disabled by user request. Skipping SoX setup.")
             return
 
+        if self.engine in ("ffmpeg", "numpy"):
+            print(f"ℹ️ {self.engine} mastering engine selected. Skipping SoX setup.")
+            return
+
         sox_locations = [
             'sox',  # Check if in system PATH first
             r'C:\Program Files (x86)\sox-14-4-2\sox.exe', # Your specific path
@@ -107,18 +286,21 @@ class PodcastPostProcessor:
                 continue
 
         if not self.sox_available:
-            print("⚠️ SoX not found - mastering will be disabled.")
+            fallback = "using the numpy mastering engine instead" if mastering_dsp else "mastering will be disabled"
+            print(f"⚠️ SoX not found - {fallback}.")
             print("⚠️ Please install SoX from: https://sourceforge.net/projects/sox/")
             print("⚠️ Tried locations:")
             for loc in sox_locations:
                 print(f"   - {loc}")
-            self.enable_mastering = False
+            if mastering_dsp:
+                self.engine = "numpy"
+            else:
+                self.enable_mastering = False
 
     def _setup_ffmpeg(self):
-        """Setup FFmpeg (ffmpeg and ffprobe) for format conversion and analysis."""
+        """Setup FFmpeg for format conversion and analysis."""
         self.ffmpeg_available = False
         self.ffmpeg_path = None
-        self.ffprobe_path = None
 
         ffmpeg_locations = [
             'ffmpeg',  # Check if in system PATH
@@ -127,13 +309,6 @@ class PodcastPostProcessor:
             '/usr/bin/ffmpeg',  # Linux
             '/usr/local/bin/ffmpeg',  # macOS
         ]
-        ffprobe_locations = [
-            'ffprobe', # Check if in system PATH
-            r'C:\ffmpeg\bin\ffprobe.exe',
-            r'C:\Program Files\ffmpeg\bin\ffprobe.exe',
-            '/usr/bin/ffprobe',
-            '/usr/local/bin/ffprobe',
-        ]
 
         print("🔍 Searching for FFmpeg...")
         for ffmpeg_candidate_path in ffmpeg_locations:
@@ -146,22 +321,11 @@ class PodcastPostProcessor:
             except (FileNotFoundError, subprocess.CalledProcessError, subprocess.TimeoutExpired):
                 continue
 
-        print("🔍 Searching for FFprobe...")
-        for ffprobe_candidate_path in ffprobe_locations:
-            try:
-                subprocess.run([ffprobe_candidate_path, '-version'],
-                               capture_output=True, text=True, check=True, timeout=5, encoding='utf-8')
-                self.ffprobe_path = ffprobe_candidate_path
-                print(f"✓ FFprobe found at: {self.ffprobe_path}")
-                break
-            except (FileNotFoundError, subprocess.CalledProcessError, subprocess.TimeoutExpired):
-                continue
-        
-        if self.ffmpeg_path and self.ffprobe_path:
+        if self.ffmpeg_path:
             self.ffmpeg_available = True
         else:
-            print("⚠️ FFmpeg (or FFprobe) not fully found - format conversion or analysis may be limited.")
-            print("⚠️ Please install FFmpeg from: https://ffmpeg.org/download.html and ensure both `ffmpeg.exe` and `ffprobe.exe` are in your PATH or accessible.")
+            print("⚠️ FFmpeg not found - format conversion or analysis may be limited.")
+            print("⚠️ Please install FFmpeg from: https://ffmpeg.org/download.html and ensure `ffmpeg.exe` is in your PATH or accessible.")
 
 
     def get_preset_info(self, preset_name):
@@ -175,7 +339,7 @@ class PodcastPostProcessor:
         for name, info in self.presets.items():
             print(f"  ✨ {name}: {info['name']}")
             print(f"    ➡️ {info['description']}")
-            print(f"    ➡️ Output Bitrate: {info['mp3_bitrate']}, Normalization: {info['normalization']}")
+            print(f"    ➡️ Output Bitrate: {info['mp3_bitrate']}, Normalization: {info['normalization']}, Loudness: {info['loudness']} LUFS")
         print("---\n")
 
     def apply_mastering_chain(self, input_file_path, output_file_path, preset=None):
@@ -189,18 +353,175 @@ class PodcastPostProcessor:
         """
         input_file = Path(input_file_path)
         output_file = Path(output_file_path)
+        self.last_error = None
+        self.last_metrics = None
 
-        if not self.enable_mastering or not self.sox_available:
-            print(f"⚠️ Mastering disabled or SoX not available - copying {input_file.name} directly to {output_file.name}")
+        if not self.enable_mastering or not self._engine_available():
+            print(f"⚠️ Mastering disabled or {self.engine} engine not available - copying {input_file.name} directly to {output_file.name}")
             shutil.copy2(input_file, output_file)
             return output_file
 
         preset_info = self.get_preset_info(preset or self.quality_preset)
-        print(f"🎚️ Applying mastering chain: {preset_info['name']}")
+        print(f"🎚️ Applying mastering chain: {preset_info['name']} ({self.engine} engine)")
         print(f"📝 {preset_info['description']}")
 
-        temp_wav_input = self.temp_dir / "audio_raw.wav"
-        temp_mastered_output = self.temp_dir / "audio_mastered.wav"
+        try:
+            engines = {"sox": self._master_sox, "ffmpeg": self._master_ffmpeg, "pipe": self._master_pipe,
+                       "numpy": self._master_numpy}
+            output_file = engines[self.engine](input_file, output_file, preset_info)
+
+            file_size_bytes = Path(output_file).stat().st_size
+            print(f"✅ Mastering complete: {output_file.name}")
+            print(f"📊 Output size: {file_size_bytes / (1024*1024):.2f} MB")
+
+            return str(output_file)
+
+        except subprocess.CalledProcessError as e:
+            tool = Path(str(e.cmd[0])).stem
+            print(f"❌ Mastering failed for {input_file.name}: {tool} process error")
+            if self.debug:
+                print(f"   Command: {' '.join(e.cmd)}")
+                if e.stdout:
+                    print(f"   Stdout: {e.stdout.strip()[:200]}...")
+                if e.stderr:
+                    print(f"   Stderr: {e.stderr.strip()[:200]}...")
+            elif e.stderr and len(e.stderr.strip()) < 200:
+                print(f"   Error: {e.stderr.strip()}")
+            
+            print(f"   Using original file as fallback...")
+            detail = (e.stderr or '').strip().splitlines()
+            self.last_error = f"{tool} process error, original copied" + (f": {detail[-1]}" if detail else "")
+            shutil.copy2(input_file, output_file)
+            return str(output_file)
+        except FileNotFoundError as e:
+            print(f"❌ Mastering failed: Executable not found. Error: {e}")
+            print(f"   Ensure SoX and FFmpeg are correctly installed and in your system's PATH, or their hardcoded paths are correct.")
+            print(f"   Copying original file to {output_file.name} as fallback.")
+            self.last_error = f"executable not found, original copied: {e}"
+            shutil.copy2(input_file, output_file)
+            return str(output_file)
+        except Exception as e:
+            print(f"❌ An unexpected error occurred during mastering of {input_file.name}: {e}")
+            print(f"   Copying original file to {output_file.name} as fallback.")
+            self.last_error = f"{e}, original copied"
+            shutil.copy2(input_file, output_file)
+            return str(output_file)
+
+    def _engine_available(self):
+        """Whether the tools needed by the selected mastering engine were found."""
+        if self.engine == "ffmpeg":
+            return bool(self.ffmpeg_path)
+        if self.engine == "pipe":
+            return self.sox_available and bool(self.ffmpeg_path)
+        if self.engine == "numpy":
+            return mastering_dsp is not None  # ffmpeg too, unless both files are WAV
+        return self.sox_available
+
+    def _print_chain_steps(self):
+        print(f"🎛️ Applying {self.engine} mastering effects:")
+        for step in MASTERING_STEPS:
+            print(f"   → {step}")
+
+    def _build_sox_effects(self, preset_info):
+        """
+        SoX effect arguments for a preset, in chain order.
+
+        Returns:
+            list: Arguments to append after the SoX input and output files.
+        """
+        effects = []
+
+        # 1. Noise gate using compand - SoX doesn't have a separate gate effect
+        # Format: compand attack,decay transfer_function gain initial_volume delay
+        # This acts as a noise gate: signals below -40dB are heavily attenuated
+        effects.extend(['compand', '0.1,0.2', '-inf,-40.1,-inf,-40,-40', '0', '-90', '0.1'])
+
+        # 2. High-pass filter - remove low-frequency rumble
+        effects.extend(['highpass', '80'])
+
+        # 3. Compression with careful parameter handling
+        if preset_info.get('compression') == 'heavy':
+            # Attack,decay transfer_function gain initial_volume delay
+            effects.extend(['compand', '0.05,0.2', '6:-40,-40,-25,-25,-15,-15', '0', '-90', '0.1'])
+            effects.extend(['gain', '-8'])  # Apply -8dB gain reduction separately
+        elif preset_info.get('compression') == 'light':
+            effects.extend(['compand', '0.1,0.3', '6:-25,-25,-15,-15,-5,-5', '0', '-90', '0.2'])
+            effects.extend(['gain', '-3'])  # Apply -3dB gain reduction separately
+        else:  # medium
+            effects.extend(['compand', '0.05,0.2', '6:-30,-30,-20,-20,-10,-10', '0', '-90', '0.1'])
+            effects.extend(['gain', '-6'])  # Apply -6dB gain reduction separately
+
+        # 4. EQ
+        effects.extend(['equalizer', '200', '0.7', '2'])    # Warmth/body
+        effects.extend(['equalizer', '3000', '0.5', '1.5']) # Presence/intelligibility
+        effects.extend(['equalizer', '8000', '0.3', '-2'])  # Reduce harshness/sibilance more aggressively
+
+        # 5. De-esser - reduce harsh 's' sounds (sibilants) for Dutch speech
+        # Target the 6-8kHz range where sibilants are most prominent
+        effects.extend(['compand', '0.01,0.05', '6:-15,-15,-10,-8,-5,-5', '0', '-90', '0.01'])
+        effects.extend(['equalizer', '6500', '0.8', '-3'])  # Additional sibilant reduction
+
+        # 6. Light limiting using compand
+        effects.extend(['compand', '0.01,0.02', '6:-20,-20,-10,-10', '0', '-90', '0.01'])
+
+        # 7. Safety limiter to prevent any clipping
+        effects.extend(['compand', '0.001,0.001', '6:-6,-6,-3,-3,0,-3', '0', '-90', '0.001'])
+
+        # 8. Final normalization
+        effects.extend(['norm', preset_info['normalization']])
+        return effects
+
+    def _build_ffmpeg_filters(self, preset_info):
+        """
+        The SoX chain of a preset expressed as one ffmpeg filtergraph.
+
+        Like SoX, the compression stage is only a static gain and the -3dB
+        safety limiter does the peak control. Two deliberate differences:
+        ffmpeg's deesser replaces SoX's broadband de-esser compand, and peak
+        normalization is replaced by loudnorm to the preset's loudness target,
+        with the preset's normalization level as true-peak ceiling.
+
+        Returns:
+            str: Comma-separated filter chain for ffmpeg -af.
+        """
+        gain = COMPRESSION_GAIN_DB.get(preset_info.get('compression'), COMPRESSION_GAIN_DB['medium'])
+        true_peak = float(preset_info['normalization'])
+
+        filters = [
+            # 1. Noise gate: attenuate everything below -40dB
+            'agate=threshold=0.01:ratio=9000:range=0.001:attack=100:release=200',
+            # 2. High-pass filter
+            'highpass=f=80',
+            # 3. Compression: the SoX curves are flat, leaving only the gain
+            f'volume={gain}dB',
+            # 4. EQ (width as Q, like SoX)
+            'equalizer=f=200:t=q:w=0.7:g=2',
+            'equalizer=f=3000:t=q:w=0.5:g=1.5',
+            'equalizer=f=8000:t=q:w=0.3:g=-2',
+            # 5. De-esser plus the additional sibilant cut
+            'deesser=i=0.4:f=0.5',
+            'equalizer=f=6500:t=q:w=0.8:g=-3',
+            # 6./7. Safety limiter; level=0 keeps it from re-normalizing on its own
+            f'alimiter=limit={10 ** (SAFETY_LIMIT_DB / 20):.3f}:attack=5:release=50:level=0',
+            # 8. Loudness normalization; loudnorm resamples internally, so resample back
+            f"loudnorm=I={preset_info['loudness']}:TP={true_peak}:LRA=11",
+            f'aresample={MASTERING_SAMPLE_RATE}',
+        ]
+        return ','.join(filters)
+
+    def _ffmpeg_encode_args(self, output_file, preset_info):
+        """ffmpeg output arguments for the final file, by extension."""
+        if output_file.suffix.lower() == '.mp3':
+            return ['-codec:a', 'libmp3lame', '-b:a', preset_info['mp3_bitrate'], '-ar', str(MASTERING_SAMPLE_RATE)]
+        return ['-codec:a', 'pcm_s16le', '-ar', str(MASTERING_SAMPLE_RATE)]
+
+    def _master_sox(self, input_file, output_file, preset_info):
+        """Three processes with temp WAV files: ffmpeg decode, SoX chain, ffmpeg encode."""
+        # Private working directory, so concurrent jobs never share temp files
+        self.temp_dir.mkdir(exist_ok=True)
+        job_dir = Path(tempfile.mkdtemp(prefix="job_", dir=self.temp_dir))
+        temp_wav_input = job_dir / "audio_raw.wav"
+        temp_mastered_output = job_dir / "audio_mastered.wav"
 
         try:
             # Step 1: Convert input to WAV for SoX processing using FFmpeg primarily
@@ -226,80 +547,28 @@ class PodcastPostProcessor:
                 raise RuntimeError(f"Failed to create temporary WAV file: {temp_wav_input}. Conversion may have failed.")
 
             # Step 2: Apply mastering chain with SoX
-            print("🎛️ Applying SoX mastering effects:")
-            sox_effects_steps = [
-                "→ Noise gate (compand-based silence/noise removal)",
-                "→ High-pass filter (remove rumble/DC offset)",
-                "→ Compression (dynamic range control)",
-                "→ EQ (frequency balancing)",
-                "→ De-esser (reduce harsh 's' sounds for Dutch speech)",
-                "→ Limiting (prevent clipping)",
-                "→ Safety limiter (final clip protection)",
-                "→ Normalization (optimal loudness)"
-            ]
-
-            for step in sox_effects_steps:
-                print(f"   {step}")
-
-            # Build SoX command - use compand for noise gating instead of gate effect
+            self._print_chain_steps()
             sox_cmd = [self.sox_path, str(temp_wav_input), str(temp_mastered_output)]
-
-            # 1. Noise gate using compand - SoX doesn't have a separate gate effect
-            # Format: compand attack,decay transfer_function gain initial_volume delay
-            # This acts as a noise gate: signals below -40dB are heavily attenuated
-            sox_cmd.extend(['compand', '0.1,0.2', '-inf,-40.1,-inf,-40,-40', '0', '-90', '0.1'])
-
-            # 2. High-pass filter - remove low-frequency rumble
-            sox_cmd.extend(['highpass', '80'])
-
-            # 3. Compression with careful parameter handling
-            if preset_info.get('compression') == 'heavy':
-                # Attack,decay transfer_function gain initial_volume delay
-                sox_cmd.extend(['compand', '0.05,0.2', '6:-40,-40,-25,-25,-15,-15', '0', '-90', '0.1'])
-                sox_cmd.extend(['gain', '-8'])  # Apply -8dB gain reduction separately
-            elif preset_info.get('compression') == 'light':
-                sox_cmd.extend(['compand', '0.1,0.3', '6:-25,-25,-15,-15,-5,-5', '0', '-90', '0.2'])
-                sox_cmd.extend(['gain', '-3'])  # Apply -3dB gain reduction separately
-            else:  # medium
-                sox_cmd.extend(['compand', '0.05,0.2', '6:-30,-30,-20,-20,-10,-10', '0', '-90', '0.1'])
-                sox_cmd.extend(['gain', '-6'])  # Apply -6dB gain reduction separately
-
-            # 4. EQ
-            sox_cmd.extend(['equalizer', '200', '0.7', '2'])    # Warmth/body
-            sox_cmd.extend(['equalizer', '3000', '0.5', '1.5']) # Presence/intelligibility
-            sox_cmd.extend(['equalizer', '8000', '0.3', '-2'])  # Reduce harshness/sibilance more aggressively
-
-            # 5. De-esser - reduce harsh 's' sounds (sibilants) for Dutch speech
-            # Target the 6-8kHz range where sibilants are most prominent
-            sox_cmd.extend(['compand', '0.01,0.05', '6:-15,-15,-10,-8,-5,-5', '0', '-90', '0.01'])
-            sox_cmd.extend(['equalizer', '6500', '0.8', '-3'])  # Additional sibilant reduction
-
-            # 6. Light limiting using compand
-            sox_cmd.extend(['compand', '0.01,0.02', '6:-20,-20,-10,-10', '0', '-90', '0.01'])
-
-            # 7. Safety limiter to prevent any clipping
-            sox_cmd.extend(['compand', '0.001,0.001', '6:-6,-6,-3,-3,0,-3', '0', '-90', '0.001'])
-
-            # 8. Final normalization
-            sox_cmd.extend(['norm', preset_info['normalization']])
+            sox_cmd.extend(self._build_sox_effects(preset_info))
 
             print("Executing SoX command...")
             if self.debug:
                 print(f"DEBUG: SoX command: {' '.join(sox_cmd)}")
-            sox_process_result = subprocess.run(sox_cmd, check=True, capture_output=True, encoding='utf-8')
+            subprocess.run(sox_cmd, check=True, capture_output=True, encoding='utf-8')
             
             # Step 3: Convert mastered WAV to final output format (MP3, WAV, etc.)
             if output_file.suffix.lower() == '.mp3':
                 print("💿 Converting mastered WAV to final MP3...")
                 if self.ffmpeg_available:
                     ffmpeg_output_cmd = [
-                        self.ffmpeg_path, '-i', str(temp_mastered_output), '-y',
-                        '-codec:a', 'libmp3lame',
-                        '-b:a', preset_info['mp3_bitrate'],
-                        '-ar', '44100',
+                        self.ffmpeg_path, '-hide_banner', '-nostats', '-i', str(temp_mastered_output), '-y',
+                        '-af', ANALYSIS_FILTERS,
+                        *self._ffmpeg_encode_args(output_file, preset_info),
                         str(output_file)
                     ]
-                    subprocess.run(ffmpeg_output_cmd, check=True, capture_output=True)
+                    result = subprocess.run(ffmpeg_output_cmd, check=True, capture_output=True,
+                                            encoding='utf-8', errors='replace')
+                    self.last_metrics = self._parse_analysis(result.stderr, "Output")
                 else:
                     print("❌ FFmpeg not available for MP3 encoding. Outputting to WAV instead.")
                     # Change output file extension to .wav if MP3 requested but cannot be encoded
@@ -308,166 +577,344 @@ class PodcastPostProcessor:
             else:
                 # For other formats (e.g., WAV output), just copy the mastered WAV
                 shutil.copy2(str(temp_mastered_output), output_file)
+            return output_file
+        finally:
+            shutil.rmtree(job_dir, ignore_errors=True)
+
+    def _master_ffmpeg(self, input_file, output_file, preset_info):
+        """One ffmpeg process: decode, filter, analyze and encode in a single pass, nothing written but the output."""
+        self._print_chain_steps()
+        ffmpeg_cmd = [
+            self.ffmpeg_path, '-hide_banner', '-nostats', '-y', '-i', str(input_file),
+            '-af', f"{self._build_ffmpeg_filters(preset_info)},{ANALYSIS_FILTERS}",
+            *self._ffmpeg_encode_args(output_file, preset_info),
+            str(output_file)
+        ]
+        print("Executing FFmpeg command...")
+        if self.debug:
+            print(f"DEBUG: FFmpeg command: {' '.join(ffmpeg_cmd)}")
+        result = subprocess.run(ffmpeg_cmd, check=True, capture_output=True, encoding='utf-8', errors='replace')
+        self.last_metrics = self._parse_analysis(result.stderr, "Output")
+        return output_file
+
+    def _master_pipe(self, input_file, output_file, preset_info):
+        """
+        The SoX chain between an ffmpeg decoder and encoder, connected by pipes.
 
-            file_size_bytes = Path(output_file).stat().st_size
-            print(f"✅ Mastering complete: {output_file.name}")
-            print(f"📊 Output size: {file_size_bytes / (1024*1024):.2f} MB")
-
-            return str(output_file)
+        Audio travels in SoX's native format, so no temp WAV files are written.
+        SoX's norm effect needs two passes and buffers the audio itself.
+        """
+        self._print_chain_steps()
+        decode_cmd = [self.ffmpeg_path, '-hide_banner', '-i', str(input_file),
+                      '-ar', str(MASTERING_SAMPLE_RATE), '-f', 'sox', 'pipe:1']
+        sox_cmd = [self.sox_path, '-t', 'sox', '-', '-t', 'sox', '-', *self._build_sox_effects(preset_info)]
+        encode_cmd = [self.ffmpeg_path, '-hide_banner', '-nostats', '-y', '-f', 'sox', '-i', 'pipe:0',
+                      '-af', ANALYSIS_FILTERS, *self._ffmpeg_encode_args(output_file, preset_info), str(output_file)]
+
+        print("Executing FFmpeg → SoX → FFmpeg pipeline...")
+        if self.debug:
+            print(f"DEBUG: Pipeline: {' '.join(decode_cmd)} | {' '.join(sox_cmd)} | {' '.join(encode_cmd)}")
+
+        # stderr goes to temp files: undrained stderr pipes could stall the pipeline
+        with tempfile.TemporaryFile() as decode_log, tempfile.TemporaryFile() as sox_log, \
+                tempfile.TemporaryFile() as encode_log:
+            decoder = subprocess.Popen(decode_cmd, stdout=subprocess.PIPE, stderr=decode_log)
+            sox = subprocess.Popen(sox_cmd, stdin=decoder.stdout, stdout=subprocess.PIPE, stderr=sox_log)
+            encoder = subprocess.Popen(encode_cmd, stdin=sox.stdout, stderr=encode_log)
+            # Only the child processes hold the pipe ends now, so EOF and SIGPIPE propagate
+            decoder.stdout.close()
+            sox.stdout.close()
+
+            stages = [(decoder, decode_cmd, decode_log), (sox, sox_cmd, sox_log), (encoder, encode_cmd, encode_log)]
+            failed = [(process.wait(), cmd, log) for process, cmd, log in stages]
+            failed = [(return_code, cmd, log) for return_code, cmd, log in failed if return_code != 0]
+            if failed:
+                # A failing stage usually breaks the others too; report the first, with every stage's errors
+                messages = []
+                for _, cmd, log in failed:
+                    log.seek(0)
+                    messages.append(f"{Path(str(cmd[0])).stem}: {log.read().decode('utf-8', errors='replace').strip()}")
+                raise subprocess.CalledProcessError(failed[0][0], failed[0][1], stderr="\n".join(messages))
+            encode_log.seek(0)
+            self.last_metrics = self._parse_analysis(encode_log.read().decode('utf-8', errors='replace'), "Output")
+        return output_file
+
+    def _master_numpy(self, input_file, output_file, preset_info):
+        """
+        The mastering chain in-process (mastering_dsp), streamed in chunks from decoder to encoder.
 
-        except subprocess.CalledProcessError as e:
-            print(f"❌ Mastering failed for {input_file.name}: SoX process error")
+        Memory stays bounded whatever the length of the file. Peak normalization
+        needs the whole result first, so the chain output is spooled to an unnamed
+        temp file and scaled while it is read back. 16-bit WAV is read and written
+        with the wave module, so WAV to WAV needs no external binary at all.
+        """
+        if not self.ffmpeg_path and output_file.suffix.lower() != '.wav':
+            raise RuntimeError(f"FFmpeg is needed to encode {output_file.suffix} output")
+        self._print_chain_steps()
+        print("Executing numpy mastering chain...")
+        chunk_frames = 1 << 16
+
+        with tempfile.TemporaryFile() as decode_log, tempfile.TemporaryFile() as encode_log, \
+                tempfile.TemporaryFile() as spool:
+            # Pass 1: decode, master and spool, measuring the peak for normalization
+            source, decoder, decode_cmd = self._open_pcm_source(input_file, decode_log)
+            try:
+                with source:
+                    sample_rate, channels = source.getframerate(), source.getnchannels()
+                    chain = mastering_dsp.MasteringChain(sample_rate, preset_info)
+                    peak = 0.0
+                    while True:
+                        data = source.readframes(chunk_frames)
+                        mastered = chain.process(mastering_dsp.from_pcm16(data, channels), final=not data)
+                        peak = max(peak, mastering_dsp.peak(mastered))
+                        spool.write(mastering_dsp.to_float32(mastered))
+                        if not data:
+                            break
+            except BaseException:
+                if decoder:
+                    decoder.kill()  # Don't leave it blocked on a pipe nobody reads
+                    decoder.wait()
+                raise
+            finally:
+                if decoder:
+                    decoder.stdout.close()
+            if decoder and decoder.wait() != 0:
+                raise subprocess.CalledProcessError(decoder.returncode, decode_cmd, stderr=self._read_log(decode_log))
+
+            # Pass 2: normalize and encode
+            gain = mastering_dsp.normalization_gain(peak, preset_info['normalization'])
+            spool.seek(0)
+            chunk_bytes = chunk_frames * channels * 4
+            if not self.ffmpeg_path:
+                with wave.open(str(output_file), 'wb') as sink:
+                    sink.setnchannels(channels)
+                    sink.setsampwidth(2)
+                    sink.setframerate(sample_rate)
+                    for data in iter(lambda: spool.read(chunk_bytes), b''):
+                        sink.writeframes(mastering_dsp.float32_to_pcm16(data, gain))
+                return output_file
+
+            encode_cmd = [self.ffmpeg_path, '-hide_banner', '-nostats', '-y',
+                          '-f', 's16le', '-ar', str(sample_rate), '-ac', str(channels), '-i', 'pipe:0',
+                          '-af', ANALYSIS_FILTERS, *self._ffmpeg_encode_args(output_file, preset_info), str(output_file)]
             if self.debug:
-                print(f"   Command: {' '.join(e.cmd)}")
-                if e.stdout:
-                    print(f"   Stdout: {e.stdout.strip()[:200]}...")
-                if e.stderr:
-                    print(f"   Stderr: {e.stderr.strip()[:200]}...")
-            elif e.stderr and len(e.stderr.strip()) < 200:
-                print(f"   Error: {e.stderr.strip()}")
-            
-            print(f"   Using original file as fallback...")
-            shutil.copy2(input_file, output_file)
-            return str(output_file)
-        except FileNotFoundError as e:
-            print(f"❌ Mastering failed: Executable not found. Error: {e}")
-            print(f"   Ensure SoX and FFmpeg are correctly installed and in your system's PATH, or their hardcoded paths are correct.")
-            print(f"   Copying original file to {output_file.name} as fallback.")
-            shutil.copy2(input_file, output_file)
-            return str(output_file)
-        except Exception as e:
-            print(f"❌ An unexpected error occurred during mastering of {input_file.name}: {e}")
-            print(f"   Copying original file to {output_file.name} as fallback.")
-            shutil.copy2(input_file, output_file)
-            return str(output_file)
+                print(f"DEBUG: FFmpeg command: {' '.join(encode_cmd)}")
+            encoder = subprocess.Popen(encode_cmd, stdin=subprocess.PIPE, stderr=encode_log)
+            try:
+                for data in iter(lambda: spool.read(chunk_bytes), b''):
+                    encoder.stdin.write(mastering_dsp.float32_to_pcm16(data, gain))
+            except BrokenPipeError:
+                pass  # The encoder failed; its return code and log say why
+            finally:
+                encoder.stdin.close()
+            encoder.wait()
+            log = self._read_log(encode_log)
+            if encoder.returncode != 0:
+                raise subprocess.CalledProcessError(encoder.returncode, encode_cmd, stderr=log)
+            self.last_metrics = self._parse_analysis(log, "Output")
+        return output_file
+
+    def _open_pcm_source(self, input_file, decode_log):
+        """
+        Open input_file as a 16-bit PCM wave stream.
+
+        Returns:
+            tuple: (wave reader, decoder process or None, decoder command or None).
+                   Plain 16-bit WAV files are read directly, anything else through ffmpeg.
+        """
+        if input_file.suffix.lower() == '.wav':
+            try:
+                source = wave.open(str(input_file), 'rb')
+                if source.getsampwidth() == 2:
+                    return source, None, None
+                source.close()
+            except (wave.Error, EOFError):
+                pass  # Not plain PCM; let ffmpeg decode it
+        if not self.ffmpeg_path:
+            raise RuntimeError(f"FFmpeg is needed to decode {input_file.name}")
+
+        decode_cmd = [self.ffmpeg_path, '-hide_banner', '-i', str(input_file),
+                      '-ar', str(MASTERING_SAMPLE_RATE), '-acodec', 'pcm_s16le', '-f', 'wav', 'pipe:1']
+        if self.debug:
+            print(f"DEBUG: FFmpeg command: {' '.join(decode_cmd)}")
+        decoder = subprocess.Popen(decode_cmd, stdout=subprocess.PIPE, stderr=decode_log)
+        try:
+            return wave.open(decoder.stdout, 'rb'), decoder, decode_cmd
+        except (wave.Error, EOFError):
+            # No WAV header: the decoder failed before writing any audio
+            decoder.stdout.close()
+            decoder.wait()
+            raise subprocess.CalledProcessError(decoder.returncode, decode_cmd, stderr=self._read_log(decode_log))
+
+    @staticmethod
+    def _read_log(log):
+        log.seek(0)
+        return log.read().decode('utf-8', errors='replace')
+
+    def analyze_audio_quality(self, audio_file_path, metrics=None):
+        """
+        Analyze audio quality: format info, peak, RMS and EBU R128 loudness.
+
+        Args:
+            audio_file_path (str): File to analyze.
+            metrics (dict, optional): Metrics already measured, e.g. last_metrics from the
+                                      mastering encode. When given, the file is not decoded again.
 
-    def analyze_audio_quality(self, audio_file_path):
-        """Analyze audio quality using FFprobe (instead of SoX) for broader format support."""
+        Returns:
+            dict: The metrics, or None if the analysis failed.
+        """
         audio_file = Path(audio_file_path)
 
-        if not self.ffmpeg_available or not self.ffprobe_path:
-            print("⚠️ FFprobe not available - skipping quality analysis.")
-            return None
+        if metrics is None:
+            if not self.ffmpeg_available:
+                print("⚠️ FFmpeg not available - skipping quality analysis.")
+                return None
 
-        try:
-            print(f"\n📊 Analyzing audio quality for: {audio_file.name} using FFprobe")
-
-            # FFprobe command to get stream and format info in JSON format
-            ffprobe_cmd = [
-                self.ffprobe_path,
-                '-v', 'quiet',  # Suppress verbose output
-                '-print_format', 'json',
-                '-show_format',
-                '-show_streams',
-                '-i', str(audio_file)
-            ]
-            
-            result = subprocess.run(ffprobe_cmd, capture_output=True, text=True, check=True, encoding='utf-8')
-            info = json.loads(result.stdout)
-
-            metrics = {}
-            audio_stream = None
-
-            # Find the first audio stream
-            for stream in info.get('streams', []):
-                if stream.get('codec_type') == 'audio':
-                    audio_stream = stream
-                    break
-
-            if audio_stream:
-                metrics['codec_name'] = audio_stream.get('codec_name')
-                metrics['sample_rate'] = audio_stream.get('sample_rate')
-                metrics['channels'] = audio_stream.get('channels')
-                metrics['bit_rate'] = audio_stream.get('bit_rate')
-                metrics['duration_seconds'] = float(audio_stream.get('duration', 0)) if audio_stream.get('duration') else 'N/A'
-                metrics['loudness_integrated_lufs'] = 'N/A' # FFprobe doesn't directly give LUFS without a filter
-                
-                # Try to get peak and RMS level using FFmpeg's volumedetect filter
-                # This is a separate FFmpeg call, as ffprobe itself doesn't do this easily.
-                # Only if ffmpeg is available
-                if self.ffmpeg_path:
-                    try:
-                        volumedetect_cmd = [
-                            self.ffmpeg_path,
-                            '-i', str(audio_file),
-                            '-af', 'volumedetect',
-                            '-vn', '-sn', '-dn', # Disable video, subtitle, data streams
-                            '-f', 'null',
-                            '-' # Output to stdout
-                        ]
-                        vol_result = subprocess.run(volumedetect_cmd, capture_output=True, text=True, check=False, encoding='utf-8') # check=False because volumedetect often returns non-zero for verbose output
-                        
-                        # Parse volumedetect output (usually in stderr)
-                        vol_lines = vol_result.stderr.splitlines()
-                        for line in vol_lines:
-                            if 'max_volume:' in line:
-                                metrics['peak_level_db'] = line.split('max_volume:')[1].strip().split(' ')[0]
-                            elif 'mean_volume:' in line:
-                                metrics['rms_level_db'] = line.split('mean_volume:')[1].strip().split(' ')[0]
-
-                    except Exception as ve:
-                        print(f"  ⚠️  Could not run volumedetect with FFmpeg: {ve}")
-
-            print(f"\n📊 Audio Quality Metrics for {audio_file.name}:")
-            print(f"  🎵 Codec: {metrics.get('codec_name', 'N/A')}")
-            print(f"  🎵 Duration: {metrics.get('duration_seconds', 'N/A'):.2f} seconds")
-            print(f"  🔊 Peak Level: {metrics.get('peak_level_db', 'N/A')} dB")
-            print(f"  📈 RMS Level (Mean Volume): {metrics.get('rms_level_db', 'N/A')} dB")
-            print(f"  📊 Sample Rate: {metrics.get('sample_rate', 'N/A')} Hz")
-            print(f"  ➡️ Channels: {metrics.get('channels', 'N/A')}")
-            print(f"  ➡️ Bit Rate: {float(metrics.get('bit_rate', 0)) / 1000:.0f} kbps" if metrics.get('bit_rate') != 'N/A' else '  ➡️ Bit Rate: N/A')
-            
-            # Quality assessment (using FFprobe data)
-            print(f"\n🎯 Quality Assessment:")
+            print(f"\n📊 Analyzing audio quality for: {audio_file.name} using FFmpeg")
             try:
-                peak_db = float(metrics.get('peak_level_db', '0').replace('dB', '').strip())
-                rms_db = float(metrics.get('rms_level_db', '-30').replace('dB', '').strip())
-                
-                if peak_db > -0.5:
-                    print(f"  ⚠️  Peak level is very high ({peak_db:.1f} dB) - potential clipping.")
-                elif peak_db > -3.0:
-                    print(f"  ✅ Peak level good ({peak_db:.1f} dB).")
-                else:
-                    print(f"  ℹ️  Peak level is low ({peak_db:.1f} dB) - could be louder.")
+                # One decode measures everything; nothing is written
+                analysis_cmd = [
+                    self.ffmpeg_path, '-hide_banner', '-nostats', '-i', str(audio_file),
+                    '-af', ANALYSIS_FILTERS, '-vn', '-sn', '-dn', '-f', 'null', '-'
+                ]
+                result = subprocess.run(analysis_cmd, capture_output=True, check=True, encoding='utf-8', errors='replace')
+                metrics = self._parse_analysis(result.stderr, "Input")
+            except subprocess.CalledProcessError as e:
+                print(f"❌ Failed to analyze {audio_file.name}: FFmpeg command failed.")
+                if e.stderr:
+                    print(f"   Stderr:\n{e.stderr.strip()[-500:]}")
+                print(f"   Command that failed: {' '.join(e.cmd)}")
+                return None
+            except FileNotFoundError as e:
+                print(f"❌ Failed to analyze {audio_file.name}: FFmpeg executable not found. Error: {e}")
+                return None
+            except Exception as e:
+                print(f"❌ An unexpected error occurred during analysis of {audio_file.name}: {e}")
+                return None
+
+        def show(key, unit, digits=1):
+            value = metrics.get(key)
+            return f"{value:.{digits}f} {unit}" if isinstance(value, (int, float)) else 'N/A'
+
+        print(f"\n📊 Audio Quality Metrics for {audio_file.name}:")
+        print(f"  🎵 Codec: {metrics.get('codec_name') or 'N/A'}")
+        print(f"  🎵 Duration: {show('duration_seconds', 'seconds', 2)}")
+        print(f"  🔊 Peak Level: {show('peak_level_db', 'dB')} (true peak {show('true_peak_dbfs', 'dBFS')})")
+        print(f"  📈 RMS Level (Mean Volume): {show('rms_level_db', 'dB')}")
+        print(f"  🎚️ Integrated Loudness: {show('loudness_integrated_lufs', 'LUFS')} (range {show('loudness_range_lu', 'LU')})")
+        print(f"  📊 Sample Rate: {metrics.get('sample_rate') or 'N/A'} Hz")
+        print(f"  ➡️ Channels: {metrics.get('channels') or 'N/A'}")
+        print(f"  ➡️ Bit Rate: {metrics['bit_rate'] / 1000:.0f} kbps" if metrics.get('bit_rate') else '  ➡️ Bit Rate: N/A')
+
+        print(f"\n🎯 Quality Assessment:")
+        peak_db = metrics.get('peak_level_db')
+        rms_db = metrics.get('rms_level_db')
+        lufs = metrics.get('loudness_integrated_lufs')
+        if peak_db is None or rms_db is None:
+            print(f"  ⚠️  Could not perform numerical quality assessment due to missing or invalid metrics.")
+            return metrics
 
-                if rms_db > -10.0:
-                    print(f"  ⚠️  RMS level is very high ({rms_db:.1f} dB) - likely over-compressed.")
-                elif rms_db < -20.0:
-                    print(f"  ℹ️  RMS level is low ({rms_db:.1f} dB) - may sound too quiet.")
-                else:
-                    print(f"  ✅ RMS level good ({rms_db:.1f} dB).")
-                                    
-            except (ValueError, TypeError):
-                print(f"  ⚠️  Could not perform numerical quality assessment due to missing or invalid metrics.")
+        if peak_db > -0.5:
+            print(f"  ⚠️  Peak level is very high ({peak_db:.1f} dB) - potential clipping.")
+        elif peak_db > -3.0:
+            print(f"  ✅ Peak level good ({peak_db:.1f} dB).")
+        else:
+            print(f"  ℹ️  Peak level is low ({peak_db:.1f} dB) - could be louder.")
 
-            return metrics
-            
-        except subprocess.CalledProcessError as e:
-            print(f"❌ Failed to analyze {audio_file.name}: FFprobe command failed.")
-            if e.stdout:
-                print(f"   Stdout:\n{e.stdout.strip()}")
-            if e.stderr:
-                print(f"   Stderr:\n{e.stderr.strip()}")
-            print(f"   Command that failed: {' '.join(e.cmd)}")
-            return None
-        except FileNotFoundError as e:
-            print(f"❌ Failed to analyze {audio_file.name}: FFprobe executable not found. Error: {e}")
-            return None
-        except json.JSONDecodeError as e:
-            print(f"❌ Failed to parse FFprobe JSON output for {audio_file.name}: {e}")
-            print(f"   FFprobe raw output (if any):\n{result.stdout if 'result' in locals() else 'N/A'}")
-            return None
-        except Exception as e:
-            print(f"❌ An unexpected error occurred during analysis of {audio_file.name}: {e}")
-            return None
+        if rms_db > -10.0:
+            print(f"  ⚠️  RMS level is very high ({rms_db:.1f} dB) - likely over-compressed.")
+        elif rms_db < -20.0:
+            print(f"  ℹ️  RMS level is low ({rms_db:.1f} dB) - may sound too quiet.")
+        else:
+            print(f"  ✅ RMS level good ({rms_db:.1f} dB).")
+
+        if lufs is not None:
+            if lufs > -13.0:
+                print(f"  ⚠️  Loudness is very high ({lufs:.1f} LUFS) - platforms will turn it down.")
+            elif lufs < -24.0:
+                print(f"  ℹ️  Loudness is low ({lufs:.1f} LUFS) - quieter than most podcasts (-16 to -19 LUFS).")
+            else:
+                print(f"  ✅ Loudness good ({lufs:.1f} LUFS).")
+
+        return metrics
+
+    @staticmethod
+    def _parse_analysis(stderr, section):
+        """
+        Collect metrics from the stderr of an ffmpeg run that used ANALYSIS_FILTERS.
+
+        Args:
+            stderr (str): ffmpeg's log output.
+            section (str): "Input" to describe the decoded file, "Output" for the encoded one.
+
+        Returns:
+            dict: Metrics; values that could not be found are None.
+        """
+        def number(pattern, text):
+            match = re.search(pattern, text, re.MULTILINE)
+            return float(match.group(1)) if match and match.group(1) not in ('-inf', 'inf', 'nan') else None
+
+        metrics = dict.fromkeys([
+            'codec_name', 'sample_rate', 'channels', 'bit_rate', 'duration_seconds',
+            'peak_level_db', 'rms_level_db', 'loudness_integrated_lufs', 'loudness_range_lu', 'true_peak_dbfs'
+        ])
+
+        # Stream line, e.g. "Stream #0:0: Audio: mp3 (mp3float), 44100 Hz, mono, fltp, 128 kb/s"
+        stream = re.search(rf"^{section} #0.*?^\s*Stream #0:\d+.*?: Audio: (.+)$", stderr, re.MULTILINE | re.DOTALL)
+        if stream:
+            description = stream.group(1)
+            metrics['codec_name'] = description.split(',')[0].split()[0]
+            sample_rate = re.search(r"(\d+) Hz", description)
+            metrics['sample_rate'] = int(sample_rate.group(1)) if sample_rate else None
+            layout = description.split(',')[2].strip() if description.count(',') >= 2 else ''
+            channels = re.match(r"(\d+) channels", layout)
+            metrics['channels'] = {'mono': 1, 'stereo': 2}.get(layout, int(channels.group(1)) if channels else None)
+            bit_rate = re.search(r"(\d+) kb/s", description)
+            metrics['bit_rate'] = int(bit_rate.group(1)) * 1000 if bit_rate else None
+
+        # astats prints per-channel blocks first, then the "Overall" block
+        overall = stderr[stderr.rfind('] Overall'):] if '] Overall' in stderr else ''
+        metrics['peak_level_db'] = number(r"Peak level dB: (\S+)", overall)
+        metrics['rms_level_db'] = number(r"RMS level dB: (\S+)", overall)
+        samples = number(r"Number of samples: (\S+)", overall)
+        if samples is not None and metrics['sample_rate']:
+            metrics['duration_seconds'] = samples / metrics['sample_rate']
+        else:
+            duration = re.search(r"Duration: (\d+):(\d+):(\d+\.?\d*)", stderr)
+            if duration:
+                hours, minutes, seconds = duration.groups()
+                metrics['duration_seconds'] = int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+        summary = stderr[stderr.rfind('Summary:'):] if 'Summary:' in stderr else ''
+        metrics['loudness_integrated_lufs'] = number(r"^\s*I:\s+(\S+) LUFS", summary)
+        metrics['loudness_range_lu'] = number(r"^\s*LRA:\s+(\S+) LU", summary)
+        metrics['true_peak_dbfs'] = number(r"^\s*Peak:\s+(\S+) dBFS", summary)
+        return metrics
+
+    def batch_process(self, input_directory_path, output_directory_path=None, preset=None, jobs=0, force=False):
+        """
+        Process all audio files in a directory.
+
+        Args:
+            input_directory_path (str): Directory searched recursively for audio files.
+            output_directory_path (str, optional): Where mastered files go. Defaults to <input>/mastered.
+            preset (str, optional): Name of the quality preset to use. Defaults to self.quality_preset.
+            jobs (int): Files mastered in parallel, each in its own process. 0 uses one per CPU core.
+            force (bool): Master every file, even those the manifest lists as up to date.
 
-    def batch_process(self, input_directory_path, output_directory_path=None, preset=None):
-        """Process all audio files in a directory."""
+        Returns:
+            list: (input file, output path or None, error message or None) per file, in input order.
+                  Files whose mastering fell back to copying the original carry an error too.
+
+        A manifest next to the output directory (<output>_manifest.json) records each
+        mastered file. Files whose content, preset, engine and chain version are unchanged
+        and whose output is intact are skipped, and their recorded metrics are reported.
+        """
         input_path = Path(input_directory_path)
 
         if not input_path.exists():
             print(f"❌ Input directory not found: {input_directory_path}")
-            return
+            return []
 
         if output_directory_path is None:
             output_path = input_path / "mastered"
@@ -482,34 +929,113 @@ class PodcastPostProcessor:
         for ext in audio_extensions:
             audio_files.extend(input_path.rglob(f"*{ext.lower()}"))
         
-        audio_files = list(set(audio_files)) 
+        # Earlier results in an output directory inside the input tree are not inputs
+        resolved_output = output_path.resolve()
+        audio_files = [f for f in set(audio_files) if resolved_output not in f.resolve().parents]
         audio_files.sort()
 
         if not audio_files:
             print(f"❌ No supported audio files found in {input_directory_path}")
-            return
+            return []
+
+        # Copies made while mastering is unavailable are not recorded as mastered
+        manifest = None
+        if self.enable_mastering and self._engine_available():
+            manifest = MasteringManifest.load(output_path.with_name(f"{output_path.name}_manifest.json"))
+            preset_name = preset or self.quality_preset
+            preset_info = self.get_preset_info(preset_name)
+
+        tasks = {}  # audio_file -> (output_file, manifest key, content hash, fingerprint)
+        cached = {}  # audio_file -> up-to-date manifest entry
+        for audio_file in audio_files:
+            output_file = output_path / f"{audio_file.stem}_mastered.mp3"
+            key = content_hash = fingerprint = None
+            if manifest is not None:
+                key = audio_file.relative_to(input_path).as_posix()
+                content_hash = manifest.content_hash(key, audio_file)
+                fingerprint = MasteringManifest.fingerprint(content_hash, preset_name, preset_info, self.engine)
+                entry = manifest.up_to_date(key, fingerprint)
+                if entry and not force:
+                    cached[audio_file] = entry
+                    continue
+            tasks[audio_file] = (output_file, key, content_hash, fingerprint)
+
+        jobs = min(jobs or os.cpu_count() or 1, max(1, len(tasks)))
 
         print(f"\n---")
         print(f"📁 Processing {len(audio_files)} files from {input_directory_path}")
         print(f"📁 Output directory: {output_path}")
+        if cached:
+            print(f"⏭️ Up to date (skipped): {len(cached)} files")
+        print(f"⚡ Parallel jobs: {jobs}")
         print(f"---\n")
 
-        for i, audio_file in enumerate(audio_files, 1):
-            print(f"\n--- File {i}/{len(audio_files)} ---")
-            print(f"🎵 Processing: {audio_file.name}")
-
-            output_file_name = f"{audio_file.stem}_mastered.mp3"
-            output_file = output_path / output_file_name
-
-            processed_file_path = self.apply_mastering_chain(str(audio_file), str(output_file), preset)
+        results = []
+
+        # Each worker process gets a pickled copy of this processor. Output is buffered
+        # per file and printed in input order, so logs never interleave.
+        with ProcessPoolExecutor(max_workers=jobs) if jobs > 1 else nullcontext() as executor:
+            futures = {}
+            if executor is not None:
+                for audio_file, (output_file, _, _, _) in tasks.items():
+                    futures[audio_file] = executor.submit(self._process_batch_file, audio_file, output_file, preset, True)
+
+            for i, audio_file in enumerate(audio_files, 1):
+                print(f"\n--- File {i}/{len(audio_files)} ---")
+                if audio_file in cached:
+                    entry = cached[audio_file]
+                    cached_output = str(manifest.output_path(entry))
+                    print(f"⏭️ {audio_file.name} is up to date (mastered {entry.get('mastered_at', 'earlier')})")
+                    self.analyze_audio_quality(cached_output, metrics=entry.get("metrics"))
+                    results.append((audio_file, cached_output, None))
+                    continue
+
+                output_file, key, content_hash, fingerprint = tasks[audio_file]
+                if executor is None:
+                    processed_file_path, _, error, metrics = self._process_batch_file(audio_file, output_file, preset)
+                else:
+                    try:
+                        processed_file_path, log, error, metrics = futures[audio_file].result()
+                        print(log, end="")
+                    except Exception as e:  # The worker process itself died
+                        processed_file_path, error, metrics = None, str(e), None
+                        print(f"❌ Worker failed for {audio_file.name}: {e}")
+
+                if manifest is not None and processed_file_path and not error:
+                    manifest.record(key, audio_file, content_hash, fingerprint, processed_file_path, metrics)
+                results.append((audio_file, processed_file_path, error))
+
+        failed = [(audio_file, error) for audio_file, _, error in results if error]
+        print(f"\n🎉 Batch processing complete! {len(results) - len(failed)} of {len(results)} files processed without errors"
+              f" ({len(tasks)} mastered, {len(cached)} up to date)")
+        for audio_file, error in failed:
+            print(f"   ❌ {audio_file.name}: {error}")
+        print(f"📁 Check output directory: {output_path}")
+        return results
 
-            if processed_file_path and self.ffmpeg_available: # Use FFmpeg for analysis now
-                print(f"\n📊 Quality analysis for output file:")
-                self.analyze_audio_quality(processed_file_path)
-            print("---\n")
+    def _process_batch_file(self, audio_file, output_file, preset, capture_output=False):
+        """
+        Master and analyze one batch file; runs in a worker process when jobs > 1.
 
-        print(f"\n🎉 Batch processing complete!")
-        print(f"📁 Check output directory: {output_path}")
+        Returns:
+            tuple: (output path or None, captured output, error message or None, metrics or None)
+        """
+        buffer = io.StringIO()
+        with redirect_stdout(buffer) if capture_output else nullcontext():
+            try:
+                print(f"🎵 Processing: {audio_file.name}")
+                processed_file_path = self.apply_mastering_chain(str(audio_file), str(output_file), preset)
+
+                metrics = None
+                if processed_file_path and (self.ffmpeg_available or self.last_metrics):
+                    print(f"\n📊 Quality analysis for output file:")
+                    # Measured during the mastering encode when possible, so no extra decode
+                    metrics = self.analyze_audio_quality(processed_file_path, metrics=self.last_metrics)
+                print("---\n")
+                return processed_file_path, buffer.getvalue(), self.last_error, metrics
+            except Exception as e:
+                print(f"❌ Failed to process {audio_file.name}: {e}")
+                return None, buffer.getvalue(), str(e), None
 
     def cleanup(self):
         """Clean up temporary files and directories."""
@@ -530,7 +1056,9 @@ Examples:
   python podcast_postprocessor.py input.mp3 output.mp3
   python podcast_postprocessor.py --analyze input.mp3
   python podcast_postprocessor.py --batch ./audio_files/
+  python podcast_postprocessor.py --batch ./audio_files/ --jobs 4
   python podcast_postprocessor.py --preset audiobook input.mp3 output.mp3
+  python podcast_postprocessor.py --engine ffmpeg input.mp3 output.mp3
   python podcast_postprocessor.py --list-presets
         """
     )
@@ -539,18 +1067,26 @@ Examples:
     parser.add_argument('output', nargs='?', help='Output audio file (optional)')
     parser.add_argument('--analyze', action='store_true', help='Analyze audio quality only')
     parser.add_argument('--batch', action='store_true', help='Process all files in directory')
+    parser.add_argument('--force', action='store_true',
+                        help='Batch mode: re-master files even if the manifest lists them as up to date')
+    parser.add_argument('--jobs', type=int, default=0, metavar='N',
+                        help='Files mastered in parallel in batch mode (default: one per CPU core)')
     parser.add_argument('--preset', choices=['podcast', 'audiobook', 'broadcast', 'voice_only'], 
                         default='podcast', help='Quality preset to use')
     parser.add_argument('--list-presets', action='store_true', help='List available presets')
     parser.add_argument('--debug', action='store_true', help='Enable debug output')
     parser.add_argument('--no-mastering', action='store_true', help='Disable mastering chain')
+    parser.add_argument('--engine', choices=MASTERING_ENGINES, default='sox',
+                        help='Mastering engine: sox (temp WAV files), ffmpeg (single filtergraph), pipe (ffmpeg | sox | ffmpeg) '
+                             'or numpy (in-process, no SoX)')
     
     args = parser.parse_args()
     
     processor = PodcastPostProcessor(
         enable_mastering=not args.no_mastering,
         quality_preset=args.preset,
-        debug=args.debug
+        debug=args.debug,
+        engine=args.engine
     )
     
     try:
@@ -565,7 +1101,7 @@ Examples:
         if args.analyze:
             processor.analyze_audio_quality(args.input)
         elif args.batch:
-            processor.batch_process(args.input, args.output, args.preset)
+            processor.batch_process(args.input, args.output, args.preset, jobs=args.jobs, force=args.force)
         else:
             input_path = Path(args.input)
             if not input_path.exists():
@@ -578,30 +1114,12 @@ Examples:
             print(f"🎵 Processing single file: {input_path.name}")
             processed_output_path = processor.apply_mastering_chain(args.input, args.output, args.preset)
             
-            if processed_output_path and processor.ffmpeg_available:
+            if processed_output_path and (processor.ffmpeg_available or processor.last_metrics):
                 print(f"\n📊 Quality analysis for output file:")
-                processor.analyze_audio_quality(processed_output_path)
+                processor.analyze_audio_quality(processed_output_path, metrics=processor.last_metrics)
     
     finally:
         processor.cleanup()
 
 if __name__ == "__main__":
-    # --- How to circumvent arguments in an IDE for testing ---
-    # Uncomment one of the following lines to simulate command-line arguments
-
-    # Example 1: Simulate single file processing
-    # sys.argv = ['podcast_postprocessor.py', 'input_audio.mp3', 'output_mastered.mp3']
-
-    # Example 2: Simulate batch processing
-    sys.argv = ['podcast_postprocessor.py', '--batch', r"C:\local_dev\Mondriaan_podcast\output\episode_00", r"C:\local_dev\Mondriaan_podcast\output_mastered", '--preset', 'podcast']
-    
-    # Example 3: Simulate analysis
-    # sys.argv = ['podcast_postprocessor.py', '--analyze', r"C:\local_dev\Mondriaan_podcast\output\some_audio.mp3"]
-
-    # Example 4: Simulate listing presets
-    # sys.argv = ['podcast_postprocessor.py', '--list-presets']
-
-    # Example 5: Simulate single file with specific preset and no output specified
-    # sys.argv = ['podcast_postprocessor.py', '--preset', 'audiobook', r"C:\local_dev\Mondriaan_podcast\output\some_podcast.mp3"]
-
-    main()
\ No newline at end of file
+    main()
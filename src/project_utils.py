@@ -3,8 +3,10 @@ Project utilities for managing different podcast projects
 """
 
 import os
+from pathlib import Path
 from src.config_loader import load_config
 from src.podcast_generator import PodcastGenerator
+from src.batch_scheduler import BatchScheduler
 
 class ProjectManager:
     """Manages different podcast projects with their own configs"""
@@ -65,6 +67,54 @@ class ProjectManager:
         
         return generator
     
+    def render_batch(self, project_name, script_files=None, max_workers=None, dry_run=False, **options):
+        """Render several episodes of a project through one shared TTS worker pool
+        
+        Args:
+            project_name (str): Project to render.
+            script_files (list, optional): Script paths; defaults to every .txt file in the
+                                           project's scripts/ directory. Each episode is named
+                                           after its script file.
+            max_workers (int, optional): TTS requests in flight across the batch.
+            dry_run (bool): Only report characters and estimated time per episode.
+            **options: keep_segments, checkpoint and resume, as for create_podcast.
+        
+        Returns:
+            dict: episode name -> output path, or None for episodes that failed.
+                  With dry_run, episode name -> dry-run report.
+        """
+        generator = self.create_generator(project_name)
+        
+        if script_files is None:
+            scripts_dir = os.path.join(generator.project_dir, "scripts")
+            script_files = sorted(str(path) for path in Path(scripts_dir).glob("*.txt"))
+        
+        if not script_files:
+            print(f"No scripts found for project '{project_name}'")
+            return {}
+        
+        episodes = []
+        for script_file in script_files:
+            with open(script_file, "r", encoding="utf-8") as f:
+                episodes.append((Path(script_file).stem, f.read()))
+        
+        scheduler = BatchScheduler(generator, max_workers=max_workers)
+        
+        if dry_run:
+            reports = {}
+            for episode_name, script in episodes:
+                print(f"\n📄 {episode_name}")
+                reports[episode_name] = generator.dry_run(script, scheduler.max_workers)
+            billable = sum(report['billable_characters'] for report in reports.values())
+            estimated = generator.latency_history.estimate_wall_time(
+                [characters for report in reports.values() for characters in report['request_characters']],
+                scheduler.max_workers
+            )
+            print(f"\n💶 Batch total: {billable:,} billable characters, ~{estimated:.0f}s")
+            return reports
+        
+        return scheduler.render(episodes, **options)
+    
     def list_projects(self):
         """List all available projects"""
         if not os.path.exists(self.base_dir):
@@ -133,6 +183,7 @@ default_style = 0.4
     
     config_content += """[audio]
 model = eleven_multilingual_v2
+streaming = false
 optimize_streaming_latency = 0
 output_format = mp3_44100_128
 
@@ -140,7 +191,37 @@ output_format = mp3_44100_128
 default_pause_duration = 0.5
 long_pause_duration = 1.0
 episode_intro_music = true
-episode_outro_music = true"""
+episode_outro_music = true
+max_concurrent_requests = 1
+keep_segments = false
+checkpoint = false
+export_format = mp3
+assembly_engine = numpy
+decode_workers = 0
+latency_history = cache/latency_history.json
+
+[cache]
+enabled = true
+directory = cache/tts
+max_size_mb = 1024
+max_age_days = 90
+
+[http]
+pool_size = 10
+connect_timeout = 10
+read_timeout = 120
+max_retries = 4
+backoff_base = 1.0
+backoff_max = 30
+
+[rate_limit]
+enabled = false
+requests_per_second = 5
+characters_per_minute = 0
+initial_concurrency = 2
+min_concurrency = 1
+max_concurrency = 16
+latency_p95_threshold = 0"""
     
     # Write config.ini
     with open(os.path.join(config_dir, "config.ini"), "w") as f:
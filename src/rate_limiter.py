@@ -0,0 +1,219 @@
+"""
+Process-wide rate limiting and adaptive concurrency control for the ElevenLabs API
+"""
+
+import asyncio
+import hashlib
+import threading
+import time
+from collections import deque
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at a fixed rate"""
+
+    def __init__(self, rate_per_second, capacity):
+        self.rate = rate_per_second
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount, now):
+        """Seconds until amount tokens are available (0 if available now)"""
+        self._refill(now)
+        # A single request larger than the bucket may pass once the bucket is full
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def consume(self, amount):
+        self.tokens -= min(amount, self.capacity)
+
+
+class AIMDController:
+    """Additive-increase/multiplicative-decrease limit on requests in flight
+
+    The limit grows by one after every limit's worth of healthy responses and is
+    cut by decrease_factor on a 429, a 5xx/connection error, or when the p95
+    latency of recent requests exceeds the threshold (absolute, or relative to
+    the best p95 seen so far).
+    """
+
+    def __init__(self, initial=2, minimum=1, maximum=16, decrease_factor=0.5,
+                 latency_p95_threshold=0, latency_tolerance=2.0, window=20):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.limit = max(minimum, min(initial, maximum))
+        self.decrease_factor = decrease_factor
+        self.latency_p95_threshold = latency_p95_threshold
+        self.latency_tolerance = latency_tolerance
+
+        self.latencies = deque(maxlen=window)
+        self.best_p95 = None
+        self.healthy_streak = 0
+        self.last_decrease = 0.0
+
+    def p95_latency(self):
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))]
+
+    def _latency_unhealthy(self, p95):
+        if p95 is None or len(self.latencies) < self.latencies.maxlen // 2:
+            return False
+        if self.latency_p95_threshold and p95 > self.latency_p95_threshold:
+            return True
+        return self.best_p95 is not None and p95 > self.best_p95 * self.latency_tolerance
+
+    def _decrease(self, now):
+        # Responses already in flight report the same overload; only back off once per cooldown
+        if now - self.last_decrease < (self.p95_latency() or 1.0):
+            return
+        self.limit = max(self.minimum, int(self.limit * self.decrease_factor))
+        self.healthy_streak = 0
+        self.last_decrease = now
+
+    def record(self, latency, status_code):
+        """Feed back the outcome of one request"""
+        now = time.monotonic()
+
+        if status_code == 429 or status_code is None or status_code >= 500:
+            self._decrease(now)
+            return
+
+        self.latencies.append(latency)
+        p95 = self.p95_latency()
+
+        if self._latency_unhealthy(p95):
+            self._decrease(now)
+            return
+
+        if len(self.latencies) == self.latencies.maxlen:
+            self.best_p95 = p95 if self.best_p95 is None else min(self.best_p95, p95)
+
+        self.healthy_streak += 1
+        if self.healthy_streak >= self.limit and self.limit < self.maximum:
+            self.limit += 1
+            self.healthy_streak = 0
+
+
+class RateLimiter:
+    """Shared request/character budget plus adaptive in-flight limit for one API key"""
+
+    def __init__(self, requests_per_second=5, characters_per_minute=0, initial_concurrency=2,
+                 min_concurrency=1, max_concurrency=16, latency_p95_threshold=0):
+        """
+        Args:
+            requests_per_second (float): Sustained request rate; 0 disables the request bucket.
+            characters_per_minute (float): Sustained character rate; 0 disables the character bucket.
+            initial_concurrency (int): Requests in flight before the controller has feedback.
+            min_concurrency (int): Lower bound for the adaptive in-flight limit.
+            max_concurrency (int): Upper bound for the adaptive in-flight limit.
+            latency_p95_threshold (float): Back off when p95 latency exceeds this many seconds (0 = relative only).
+        """
+        self.request_bucket = TokenBucket(requests_per_second, max(1.0, requests_per_second)) \
+            if requests_per_second else None
+        self.character_bucket = TokenBucket(characters_per_minute / 60.0, characters_per_minute) \
+            if characters_per_minute else None
+        self.controller = AIMDController(
+            initial=initial_concurrency,
+            minimum=min_concurrency,
+            maximum=max_concurrency,
+            latency_p95_threshold=latency_p95_threshold
+        )
+
+        self.in_flight = 0
+        self.total_requests = 0
+        self.throttled_requests = 0
+        self._condition = threading.Condition()
+
+    def try_acquire(self, characters=0):
+        """Take a slot and tokens if all are available
+
+        Returns:
+            float: 0 if acquired, otherwise a hint for how long to wait before retrying.
+        """
+        with self._condition:
+            if self.in_flight >= self.controller.limit:
+                return 0.05  # Woken earlier by release() when waiting synchronously
+
+            now = time.monotonic()
+            wait = 0.0
+            if self.request_bucket:
+                wait = max(wait, self.request_bucket.wait_time(1, now))
+            if self.character_bucket and characters:
+                wait = max(wait, self.character_bucket.wait_time(characters, now))
+            if wait > 0:
+                return wait
+
+            if self.request_bucket:
+                self.request_bucket.consume(1)
+            if self.character_bucket and characters:
+                self.character_bucket.consume(characters)
+            self.in_flight += 1
+            self.total_requests += 1
+            return 0.0
+
+    def acquire(self, characters=0):
+        """Block until a request with this many characters may be sent"""
+        while True:
+            wait = self.try_acquire(characters)
+            if wait == 0:
+                return
+            with self._condition:
+                self._condition.wait(timeout=wait)
+
+    async def acquire_async(self, characters=0):
+        """Wait without blocking the event loop until a request may be sent"""
+        while True:
+            wait = self.try_acquire(characters)
+            if wait == 0:
+                return
+            await asyncio.sleep(wait)
+
+    def release(self, latency, status_code):
+        """Return the in-flight slot and feed the outcome to the AIMD controller
+
+        Args:
+            latency (float): Seconds the request took.
+            status_code (int): HTTP status, or None if no response was received.
+        """
+        with self._condition:
+            self.in_flight = max(0, self.in_flight - 1)
+            if status_code == 429:
+                self.throttled_requests += 1
+            self.controller.record(latency, status_code)
+            self._condition.notify_all()
+
+    def get_stats(self):
+        """Get current limit and counters"""
+        with self._condition:
+            return {
+                "concurrency_limit": self.controller.limit,
+                "in_flight": self.in_flight,
+                "p95_latency": self.controller.p95_latency(),
+                "total_requests": self.total_requests,
+                "throttled_requests": self.throttled_requests
+            }
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+def get_rate_limiter(api_key, **settings):
+    """Get the process-wide RateLimiter for an API key, creating it on first use
+
+    Every client using the same key shares one budget. Settings only apply when
+    the limiter is created.
+    """
+    key = hashlib.sha256(api_key.encode('utf-8')).hexdigest()
+    with _limiters_lock:
+        if key not in _limiters:
+            _limiters[key] = RateLimiter(**settings)
+        return _limiters[key]
@@ -0,0 +1,150 @@
+"""
+Compiled, immutable segment plan of a podcast script plus dry-run estimation
+"""
+
+import json
+import os
+import re
+import threading
+from collections import namedtuple
+
+from .ssml_dsl import PAIRED_TAGS
+
+# One TTS request; settings is a read-only mapping and emotions a tuple
+PlannedSegment = namedtuple('PlannedSegment', [
+    'index',        # Position of the segment in the episode
+    'line_number',  # Script line the segment came from
+    'speaker',      # Speaker name as written in the script
+    'voice_name',   # Resolved voice name
+    'voice_id',     # Resolved ElevenLabs voice ID
+    'text',         # Processed SSML sent to the API
+    'settings',     # Merged default + emotion voice settings
+    'emotions',     # Emotion markers found on the line
+    'characters',   # Billable characters
+    'pause_after',  # A [PAUZE] marker follows this segment
+    'fingerprint'   # Content hash; equals the TTS cache key
+])
+
+# Paired (tag) ... (/tag) markup understood by the SSML processor
+PAIRED_TAG_PATTERN = re.compile(r'\((/?)(' + '|'.join(PAIRED_TAGS) + r')\)')
+
+
+def find_unbalanced_tags(text):
+    """Check (tag)/(/tag) pairs in one script line
+
+    Returns:
+        list: Descriptions of unclosed, unopened or crossed tags (empty when balanced).
+    """
+    problems = []
+    open_tags = []
+    for match in PAIRED_TAG_PATTERN.finditer(text):
+        closing, tag = match.group(1), match.group(2)
+        if not closing:
+            open_tags.append(tag)
+        elif not open_tags:
+            problems.append(f"(/{tag}) without matching ({tag})")
+        elif open_tags[-1] != tag:
+            problems.append(f"(/{tag}) closes ({open_tags[-1]})")
+            open_tags.pop()
+        else:
+            open_tags.pop()
+    problems.extend(f"({tag}) is never closed" for tag in open_tags)
+    return problems
+
+
+class SegmentPlan:
+    """Result of compiling a script: ordered segments, pause markers and problems found"""
+
+    def __init__(self, segments, pause_markers, issues):
+        self.segments = tuple(segments)
+        self.pause_markers = tuple(pause_markers)  # Segments planned before each [PAUZE]
+        self.issues = tuple(issues)
+
+    def __len__(self):
+        return len(self.segments)
+
+    def __iter__(self):
+        return iter(self.segments)
+
+    @property
+    def total_characters(self):
+        return sum(segment.characters for segment in self.segments)
+
+    def characters_by_voice(self):
+        totals = {}
+        for segment in self.segments:
+            totals[segment.voice_name] = totals.get(segment.voice_name, 0) + segment.characters
+        return totals
+
+
+class LatencyHistory:
+    """Persistent record of how long TTS requests took, for dry-run time estimates
+
+    Keeps the most recent samples of (characters, seconds) and fits
+    seconds = overhead + per_character * characters.
+    """
+
+    # Used until enough requests have been measured
+    DEFAULT_OVERHEAD = 0.8
+    DEFAULT_PER_CHARACTER = 0.01
+
+    def __init__(self, path, max_samples=500):
+        self.path = path
+        self.max_samples = max_samples
+        self.samples = []
+        self._lock = threading.Lock()
+
+        if path and os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self.samples = json.load(f).get("samples", [])[-max_samples:]
+            except (OSError, ValueError) as e:
+                print(f"⚠️ Ignoring unreadable latency history {path}: {e}")
+
+    def record(self, characters, seconds):
+        """Add one measured (uncached) request"""
+        with self._lock:
+            self.samples.append([characters, round(seconds, 3)])
+            del self.samples[:-self.max_samples]
+
+    def save(self):
+        if not self.path:
+            return
+        with self._lock:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump({"samples": self.samples}, f)
+            os.replace(temp_path, self.path)
+
+    def model(self):
+        """Least-squares fit of (overhead, seconds per character)"""
+        with self._lock:
+            samples = list(self.samples)
+        if len(samples) < 5:
+            return self.DEFAULT_OVERHEAD, self.DEFAULT_PER_CHARACTER
+
+        n = len(samples)
+        mean_chars = sum(chars for chars, _ in samples) / n
+        mean_secs = sum(secs for _, secs in samples) / n
+        variance = sum((chars - mean_chars) ** 2 for chars, _ in samples)
+        if not variance:
+            return 0.0, mean_secs / mean_chars if mean_chars else self.DEFAULT_PER_CHARACTER
+
+        per_character = sum((chars - mean_chars) * (secs - mean_secs) for chars, secs in samples) / variance
+        per_character = max(0.0, per_character)
+        overhead = max(0.0, mean_secs - per_character * mean_chars)
+        return overhead, per_character
+
+    def estimate(self, characters):
+        """Estimated seconds for one request of this many characters"""
+        overhead, per_character = self.model()
+        return overhead + per_character * characters
+
+    def estimate_wall_time(self, character_counts, concurrency=1):
+        """Estimated seconds to synthesize requests of these sizes with `concurrency` in flight"""
+        durations = [self.estimate(characters) for characters in character_counts]
+        if not durations:
+            return 0.0
+        # Longest-first scheduling: bounded below by the longest request
+        return max(max(durations), sum(durations) / max(1, concurrency))
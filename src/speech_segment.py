@@ -0,0 +1,68 @@
+"""
+In-memory container for one synthesized speech segment
+"""
+
+import io
+
+# ElevenLabs PCM output is always 16-bit signed little-endian mono
+PCM_SAMPLE_WIDTH = 2
+PCM_CHANNELS = 1
+
+
+def parse_output_format(output_format):
+    """Split an ElevenLabs output format such as mp3_44100_128 or pcm_44100
+
+    Returns:
+        tuple: (codec, sample_rate, bitrate_kbps); bitrate is None for PCM.
+    """
+    parts = output_format.split('_')
+    codec = parts[0]
+    sample_rate = int(parts[1]) if len(parts) > 1 else 44100
+    bitrate = int(parts[2]) if len(parts) > 2 else None
+    return codec, sample_rate, bitrate
+
+
+class SpeechSegment:
+    """Audio bytes for one script line plus the metadata needed to assemble the episode"""
+
+    def __init__(self, index, voice_name, audio, audio_format="mp3", text=None, file_path=None, sample_rate=44100):
+        """
+        Args:
+            index (int): Position of the segment in the episode.
+            voice_name (str): Resolved voice name, used for per-voice volume adjustment.
+            audio (bytes): Encoded audio as returned by the API, or raw samples for "pcm".
+            audio_format (str): "pcm" for raw 16-bit mono samples, otherwise a format pydub/ffmpeg can decode.
+            text (str, optional): Text that was sent to the API, for logging.
+            file_path (str, optional): Where the audio was written, if it was kept on disk.
+            sample_rate (int): Sample rate of raw PCM audio.
+        """
+        self.index = index
+        self.voice_name = voice_name
+        self.audio = audio
+        self.audio_format = audio_format
+        self.text = text
+        self.file_path = file_path
+        self.sample_rate = sample_rate
+
+    @property
+    def size(self):
+        return len(self.audio)
+
+    @property
+    def is_pcm(self):
+        return self.audio_format == "pcm"
+
+    def as_buffer(self):
+        """Get a file-like object over the audio bytes"""
+        return io.BytesIO(self.audio)
+
+    def save(self, file_path):
+        """Write the audio to disk (debugging / keep-segments mode) and remember the path"""
+        with open(file_path, "wb") as f:
+            f.write(self.audio)
+        self.file_path = file_path
+        return file_path
+
+    def __repr__(self):
+        location = self.file_path or "memory"
+        return f"SpeechSegment({self.index}, {self.voice_name}, {self.size:,} bytes, {location})"
@@ -0,0 +1,216 @@
+"""
+One-pass compiler for the Dutch script markup (see docs/ssml_dsl_table.md) to SSML
+
+The markup tables below drive a single precompiled lexer regex. The lexer feeds
+a stack-based parser that builds a small tree, and the tree is emitted as SSML.
+Adding a marker means adding a table entry; the text is still scanned once.
+"""
+
+import re
+
+# Inline delimiters: **sterk**, *gematigd*, _zacht_, ~zachte spraak~
+DELIMITERS = {
+    '**': ('emphasis', 'level="strong"'),
+    '*': ('emphasis', 'level="moderate"'),
+    '_': ('emphasis', 'level="reduced"'),
+    '~': ('prosody', 'volume="soft"'),
+}
+
+# Standalone pauses: (pauze), (lange stilte), ...
+PAUSES = {
+    'pauze': '0.5s',
+    'lange pauze': '1.0s',
+    'kort pauze': '0.3s',
+    'korte pauze': '0.3s',
+    'stilte': '1.5s',
+    'lange stilte': '2.0s',
+}
+
+# Paired tags: (hoog) ... (/hoog)
+PAIRED_TAGS = {
+    'fluister': ('prosody', 'volume="x-soft"'),
+    'snel': ('prosody', 'rate="fast"'),
+    'langzaam': ('prosody', 'rate="slow"'),
+    'supersnel': ('prosody', 'rate="x-fast"'),
+    'hoog': ('prosody', 'pitch="high"'),
+    'laag': ('prosody', 'pitch="low"'),
+    'superhoog': ('prosody', 'pitch="x-high"'),
+    'superlaag': ('prosody', 'pitch="x-low"'),
+}
+
+# WOORD in capitals gets strong emphasis
+CAPS_EMPHASIS = ('emphasis', 'level="strong"')
+
+
+def _alternation(names):
+    # Longest first so "lange pauze" wins over "pauze" and "**" over "*"
+    return '|'.join(re.escape(name) for name in sorted(names, key=len, reverse=True))
+
+
+class Node:
+    """Element of the parsed markup tree; tag None is a plain container"""
+
+    __slots__ = ('tag', 'attributes', 'children', 'opener', 'marker')
+
+    def __init__(self, tag=None, attributes=None, opener='', marker=None):
+        self.tag = tag
+        self.attributes = attributes
+        self.children = []  # str, Node or Break
+        self.opener = opener  # Source text, restored if the node is never closed
+        self.marker = marker  # Delimiter or tag name that closes the node
+
+
+class Break:
+    """<break time="..."/>"""
+
+    __slots__ = ('time',)
+
+    def __init__(self, time):
+        self.time = time
+
+
+class DSLCompiler:
+    """Compiles script markup to SSML in one lexer pass
+
+    Nesting is handled with a stack. A closing marker closes the innermost open
+    node with that marker. Inline delimiters left open are restored as literal
+    text. Paired tags left open are closed at the end of their parent, and a
+    closing tag that was never opened is dropped.
+    """
+
+    def __init__(self, delimiters=None, pauses=None, paired_tags=None, caps_emphasis=CAPS_EMPHASIS):
+        self.delimiters = DELIMITERS if delimiters is None else delimiters
+        self.pauses = PAUSES if pauses is None else pauses
+        self.paired_tags = PAIRED_TAGS if paired_tags is None else paired_tags
+        self.caps_emphasis = caps_emphasis
+
+        alternatives = [
+            r'\((?P<pause>' + _alternation(self.pauses) + r')\)',
+            r'\((?P<close>/)?(?P<tag>' + _alternation(self.paired_tags) + r')\)',
+            r'(?P<delimiter>' + _alternation(self.delimiters) + r')',
+        ]
+        if caps_emphasis:
+            alternatives.append(r'\b(?P<caps>[A-Z]{2,})\b')
+        self.pattern = re.compile('|'.join(alternatives))
+
+    def parse(self, text, used=None):
+        """Parse markup into a tree
+
+        Args:
+            text (str): Marker-free script text.
+            used (list, optional): Receives the name of every marker applied, for logging.
+
+        Returns:
+            Node: Root container.
+        """
+        root = Node()
+        stack = [root]
+        position = 0
+
+        for match in self.pattern.finditer(text):
+            if match.start() > position:
+                stack[-1].children.append(text[position:match.start()])
+            position = match.end()
+            kind = match.lastgroup
+
+            if kind == 'pause':
+                stack[-1].children.append(Break(self.pauses[match.group('pause')]))
+                self._note(used, match.group(0))
+
+            elif kind == 'tag' and match.group('close'):
+                name = match.group('tag')
+                if self._find(stack, name) is not None:
+                    self._close(stack, name)
+                    self._note(used, match.group(0))
+
+            elif kind == 'tag':
+                name = match.group('tag')
+                tag, attributes = self.paired_tags[name]
+                node = Node(tag, attributes, match.group(0), name)
+                stack[-1].children.append(node)
+                stack.append(node)
+                self._note(used, match.group(0))
+
+            elif kind == 'delimiter':
+                delimiter = match.group('delimiter')
+                if self._find(stack, delimiter) is not None:
+                    self._close(stack, delimiter)
+                    self._note(used, delimiter)
+                else:
+                    tag, attributes = self.delimiters[delimiter]
+                    node = Node(tag, attributes, delimiter, delimiter)
+                    stack[-1].children.append(node)
+                    stack.append(node)
+
+            else:  # caps
+                word = match.group('caps')
+                # Already emphasized text is not wrapped twice
+                if any(node.tag == self.caps_emphasis[0] for node in stack):
+                    stack[-1].children.append(word)
+                else:
+                    node = Node(*self.caps_emphasis)
+                    node.children.append(word)
+                    stack[-1].children.append(node)
+                    self._note(used, 'CAPS')
+
+        if position < len(text):
+            stack[-1].children.append(text[position:])
+
+        # End of text closes open paired tags and restores open delimiters
+        while len(stack) > 1:
+            self._pop(stack)
+        return root
+
+    def to_ssml(self, text, used=None):
+        """Compile markup text to SSML"""
+        parts = []
+        self._emit(self.parse(text, used), parts)
+        return ''.join(parts)
+
+    @staticmethod
+    def _note(used, marker):
+        if used is not None:
+            used.append(marker)
+
+    @staticmethod
+    def _find(stack, marker):
+        for depth in range(len(stack) - 1, 0, -1):
+            if stack[depth].marker == marker:
+                return depth
+        return None
+
+    def _close(self, stack, marker):
+        """Close the innermost node for marker, resolving everything opened inside it"""
+        depth = self._find(stack, marker)
+        while len(stack) - 1 > depth:
+            self._pop(stack)
+        node = stack.pop()
+        if not node.children:
+            # "****" stays literal text; an empty "(hoog)(/hoog)" pair disappears
+            literal = node.opener * 2 if node.marker in self.delimiters else ''
+            self._unwrap(stack[-1], node, literal)
+
+    def _pop(self, stack):
+        """Remove an unclosed node: paired tags stay, delimiters revert to literal text"""
+        node = stack.pop()
+        if node.marker in self.delimiters:
+            self._unwrap(stack[-1], node, node.opener)
+
+    @staticmethod
+    def _unwrap(parent, node, literal):
+        # node is always the last child of its parent while it is being resolved
+        index = len(parent.children) - 1
+        parent.children[index:index + 1] = [literal] + node.children
+
+    def _emit(self, node, parts):
+        for child in node.children:
+            if isinstance(child, str):
+                parts.append(child)
+            elif isinstance(child, Break):
+                parts.append(f'<break time="{child.time}"/>')
+            elif child.tag is None:
+                self._emit(child, parts)
+            else:
+                parts.append(f'<{child.tag} {child.attributes}>')
+                self._emit(child, parts)
+                parts.append(f'</{child.tag}>')
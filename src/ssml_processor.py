@@ -3,14 +3,69 @@ SSML processor for converting markup to Speech Synthesis Markup Language
 with voice-specific emotion handling - ENHANCED VERSION
 """
 
+import json
 import re
 import logging
+import threading
+from collections import OrderedDict
+
+from .ssml_dsl import DSLCompiler
+
+# Any [word] marker; recognized emotions are looked up, the rest are stripped too
+EMOTION_MARKER_PATTERN = re.compile(r'\[([a-zA-ZÀ-ÿ\s]+)\]')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+class LRUCache:
+    """Thread-safe bounded least-recently-used cache with hit/miss counters"""
+    
+    def __init__(self, max_size=4096):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key, default=None):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+            return default
+    
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+    
+    def get_stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "max_size": self.max_size
+            }
 
 class SSMLProcessor:
     """Processes custom markup and converts to SSML with voice-specific settings"""
     
-    def __init__(self, voice_settings=None, enable_detailed_logging=False):
-        """Initialize SSML processor with optional voice settings and logging"""
+    def __init__(self, voice_settings=None, enable_detailed_logging=False, cache_size=4096):
+        """Initialize SSML processor with optional voice settings and logging
+        
+        Results of process_text, extract_emotion and analyze_line are memoized per
+        (text, voice_name) in an LRU cache of cache_size entries (0 disables it).
+        """
+        self.cache = LRUCache(cache_size) if cache_size else None
         self.voice_settings = voice_settings or {}
         self.detailed_logging = enable_detailed_logging
         
@@ -138,30 +193,114 @@ class SSMLProcessor:
             '[warm]': 'warm',
             '[filosofisch]': 'philosophical'
         }
+        
+        # Marker -> canonical emotion marker (legacy markers resolved), for single-pass tokenizing
+        self.marker_lookup = {marker: marker for marker in self.default_emotions}
+        self.marker_lookup.update(self.legacy_mapping)
+        
+        # Emphasis, pause, volume, rate and pitch markup, compiled to SSML in one pass
+        self.dsl = DSLCompiler()
+    
+    @property
+    def voice_settings(self):
+        return self._voice_settings
+    
+    @voice_settings.setter
+    def voice_settings(self, voice_settings):
+        # Results for the old settings can no longer be hit; free them
+        self._voice_settings = voice_settings
+        self.clear_cache()
+    
+    def update_voice_settings(self, voice_name, settings):
+        """Replace one voice's settings and invalidate cached results"""
+        self._voice_settings[voice_name] = settings
+        self.clear_cache()
+    
+    def clear_cache(self):
+        """Drop memoized results (they are never stale, but this frees their memory)"""
+        if self.cache is not None:
+            self.cache.clear()
+    
+    def get_cache_stats(self):
+        """Get hit/miss counters of the memoization cache"""
+        return self.cache.get_stats() if self.cache is not None else None
+    
+    def _memoized(self, kind, text, voice_name, compute):
+        if self.cache is None:
+            return compute()
+        # The voice's current settings are part of the key, so editing them in place
+        # (voice_settings['lucas']['default_stability'] = 0.9) never returns stale results
+        voice_config = json.dumps(self._voice_settings.get(voice_name), sort_keys=True, default=str)
+        key = (kind, text, voice_name, voice_config)
+        result = self.cache.get(key)
+        if result is None:
+            result = compute()
+            self.cache.put(key, result)
+        return result
+    
+    def tokenize_emotions(self, text):
+        """Find and strip all emotion markers in a single scan
+        
+        Returns:
+            tuple: (emotions, text) - recognized emotion markers in order of appearance
+                   (legacy markers mapped to their Dutch equivalent) and the text with every
+                   [marker] removed and whitespace collapsed.
+        """
+        emotions = []
+        lookup = self.marker_lookup
+        
+        def strip_marker(match):
+            emotion = lookup.get(match.group(0))
+            if emotion:
+                emotions.append(emotion)
+            return ''
+        
+        text = EMOTION_MARKER_PATTERN.sub(strip_marker, text)
+        return emotions, WHITESPACE_PATTERN.sub(' ', text).strip()
+    
+    def analyze_line(self, text, voice_name=None):
+        """Tokenize a speaker line once and derive everything needed to synthesize it
+        
+        Returns:
+            tuple: (emotions, settings, processed_text) - emotion markers in order, default
+                   voice settings merged with the primary emotion's settings, and the SSML text.
+        """
+        emotions, settings, processed_text = self._memoized(
+            'line', text, voice_name, lambda: self._analyze_line(text, voice_name)
+        )
+        # Copies, so callers can't alter cached results
+        return list(emotions), dict(settings), processed_text
+    
+    def _analyze_line(self, text, voice_name):
+        emotions, stripped_text = self.tokenize_emotions(text)
+        settings = {
+            **self.get_default_voice_settings(voice_name),
+            **self._settings_for_emotions(emotions, voice_name)
+        }
+        return tuple(emotions), settings, self._process_stripped_text(text, stripped_text, emotions)
     
     def process_text(self, text, voice_name=None):
         """Main processing function with enhanced logging"""
-        original_text = text
-        
+        def compute():
+            emotions_found, stripped_text = self.tokenize_emotions(text)
+            return self._process_stripped_text(text, stripped_text, emotions_found)
+        return self._memoized('text', text, voice_name, compute)
+    
+    def _process_stripped_text(self, original_text, text, emotions_found):
+        """Convert marker-free text to SSML, logging each step"""
         if self.detailed_logging:
             self.logger.info(f"=== PROCESSING START ===")
             self.logger.info(f"Original text: {original_text}")
+            if emotions_found:
+                self.logger.info(f"Emotions found: {emotions_found}")
         
-        # Step 1: Extract and log all emotions found
-        emotions_found = self.extract_all_emotions(text)
-        if self.detailed_logging and emotions_found:
-            self.logger.info(f"Emotions found: {emotions_found}")
-        
-        # Step 2: Process emphasis markers and log transformations
+        # Emotion markers are already stripped, so CAPS emphasis can't touch e.g. [EXCITED]
         text_before_emphasis = text
         text = self._process_emphasis_markers(text)
         if self.detailed_logging and text != text_before_emphasis:
             self.logger.info(f"Emphasis transformations applied")
             self._log_transformations(text_before_emphasis, text)
         
-        # Step 3: Clean emotion markers
-        text = self._clean_emotion_markers(text)
-        
         if self.detailed_logging:
             self.logger.info(f"Final processed text: {text}")
             self.logger.info(f"=== PROCESSING END ===")
@@ -170,7 +309,14 @@ class SSMLProcessor:
     
     def extract_emotion(self, line, voice_name=None):
         """Extract emotion markers and return voice settings for specific voice"""
-        emotions = self.extract_all_emotions(line)
+        settings = self._memoized(
+            'emotion', line, voice_name,
+            lambda: self._settings_for_emotions(self.extract_all_emotions(line), voice_name)
+        )
+        return dict(settings)
+    
+    def _settings_for_emotions(self, emotions, voice_name=None):
+        """Voice settings for the primary (first) emotion, or the voice defaults"""
         primary_emotion = emotions[0] if emotions else None
         
         if self.detailed_logging:
@@ -199,20 +345,9 @@ class SSMLProcessor:
     
     def extract_all_emotions(self, text):
         """Extract ALL emotion markers from text, including inline ones"""
-        emotions_found = []
-        
-        # Find all emotion markers in the text
-        emotion_pattern = r'\[([a-zA-ZÀ-ÿ\s]+)\]'
-        matches = re.findall(emotion_pattern, text)
-        
-        for match in matches:
-            emotion_marker = f'[{match}]'
-            if emotion_marker in self.default_emotions:
-                emotions_found.append(emotion_marker)
-            elif emotion_marker in self.legacy_mapping:
-                emotions_found.append(self.legacy_mapping[emotion_marker])
-        
-        return emotions_found
+        lookup = self.marker_lookup
+        return [lookup[marker.group(0)] for marker in EMOTION_MARKER_PATTERN.finditer(text)
+                if marker.group(0) in lookup]
     
     def process_text_with_emotion_splits(self, text, voice_name=None):
         """
@@ -302,112 +437,12 @@ class SSMLProcessor:
     
     def _clean_emotion_markers(self, text):
         """Remove emotion markers from text but keep SSML"""
-        # Remove ALL Dutch emotion markers from our comprehensive list
-        for emotion in self.default_emotions.keys():
-            text = text.replace(emotion, '')
-        
-        # Remove legacy markers
-        for marker in self.legacy_mapping.keys():
-            text = text.replace(marker, '')
-        
-        # Remove any remaining emotion markers in the pattern [word] 
-        # This catches any markers we missed in our lists
-        text = re.sub(r'\[([a-zA-ZÀ-ÿ\s]+)\]', '', text)
-        
-        # Clean up extra spaces
-        text = re.sub(r'\s+', ' ', text)
-        
-        return text.strip()
+        return self.tokenize_emotions(text)[1]
     
     def _process_emphasis_markers(self, text):
         """Convert custom emphasis markers to SSML with detailed logging"""
-        original_text = text
-        transformations_applied = []
-        
-        # KLEMTONEN
-        # Convert **word** to <emphasis level="strong">word</emphasis>
-        if '**' in text:
-            text = re.sub(r'\*\*([^*]+)\*\*', r'<emphasis level="strong">\1</emphasis>', text)
-            transformations_applied.append('** -> <emphasis level="strong">')
-        
-        # Convert *word* to <emphasis level="moderate">word</emphasis>  
-        if '*' in text and '**' not in original_text:  # Avoid double processing
-            text = re.sub(r'\*([^*]+)\*', r'<emphasis level="moderate">\1</emphasis>', text)
-            transformations_applied.append('* -> <emphasis level="moderate">')
-        
-        # Convert _word_ to <emphasis level="reduced">word</emphasis>
-        if '_' in text:
-            text = re.sub(r'_([^_]+)_', r'<emphasis level="reduced">\1</emphasis>', text)
-            transformations_applied.append('_ -> <emphasis level="reduced">')
-        
-        # Convert ~word~ to <prosody volume="soft">word</prosody> (zachte spraak)
-        if '~' in text:
-            text = re.sub(r'~([^~]+)~', r'<prosody volume="soft">\1</prosody>', text)
-            transformations_applied.append('~ -> <prosody volume="soft">')
-        
-        # Convert WOORD to <emphasis level="strong">WOORD</emphasis>
-        caps_words = re.findall(r'\b([A-Z]{2,})\b', text)
-        if caps_words:
-            text = re.sub(r'\b([A-Z]{2,})\b', r'<emphasis level="strong">\1</emphasis>', text)
-            transformations_applied.append('CAPS -> <emphasis level="strong">')
-        
-        # PAUZES (uitgebreid)
-        pause_mappings = [
-            (r'\(pauze\)', '<break time="0.5s"/>', '(pauze)'),
-            (r'\(lange pauze\)', '<break time="1.0s"/>', '(lange pauze)'),
-            (r'\(kort pauze\)', '<break time="0.3s"/>', '(kort pauze)'),
-            (r'\(korte pauze\)', '<break time="0.3s"/>', '(korte pauze)'),
-            (r'\(stilte\)', '<break time="1.5s"/>', '(stilte)'),
-            (r'\(lange stilte\)', '<break time="2.0s"/>', '(lange stilte)')
-        ]
-        
-        for pattern, replacement, name in pause_mappings:
-            if re.search(pattern, text):
-                text = re.sub(pattern, replacement, text)
-                transformations_applied.append(f'{name} -> {replacement}')
-        
-        # VOLUME
-        volume_mappings = [
-            (r'\(fluister\)', '<prosody volume="x-soft">', '(fluister)'),
-            (r'\(/fluister\)', '</prosody>', '(/fluister)')
-        ]
-        
-        for pattern, replacement, name in volume_mappings:
-            if re.search(pattern, text):
-                text = re.sub(pattern, replacement, text)
-                transformations_applied.append(f'{name} -> {replacement}')
-        
-        # SPREEKSNELHEID
-        rate_mappings = [
-            (r'\(snel\)', '<prosody rate="fast">', '(snel)'),
-            (r'\(/snel\)', '</prosody>', '(/snel)'),
-            (r'\(langzaam\)', '<prosody rate="slow">', '(langzaam)'),
-            (r'\(/langzaam\)', '</prosody>', '(/langzaam)'),
-            (r'\(supersnel\)', '<prosody rate="x-fast">', '(supersnel)'),
-            (r'\(/supersnel\)', '</prosody>', '(/supersnel)')
-        ]
-        
-        for pattern, replacement, name in rate_mappings:
-            if re.search(pattern, text):
-                text = re.sub(pattern, replacement, text)
-                transformations_applied.append(f'{name} -> {replacement}')
-        
-        # TOONHOOGTE  
-        pitch_mappings = [
-            (r'\(hoog\)', '<prosody pitch="high">', '(hoog)'),
-            (r'\(/hoog\)', '</prosody>', '(/hoog)'),
-            (r'\(laag\)', '<prosody pitch="low">', '(laag)'),
-            (r'\(/laag\)', '</prosody>', '(/laag)'),
-            (r'\(superhoog\)', '<prosody pitch="x-high">', '(superhoog)'),
-            (r'\(/superhoog\)', '</prosody>', '(/superhoog)'),
-            (r'\(superlaag\)', '<prosody pitch="x-low">', '(superlaag)'),
-            (r'\(/superlaag\)', '</prosody>', '(/superlaag)')
-        ]
-        
-        for pattern, replacement, name in pitch_mappings:
-            if re.search(pattern, text):
-                text = re.sub(pattern, replacement, text)
-                transformations_applied.append(f'{name} -> {replacement}')
+        transformations_applied = [] if self.detailed_logging else None
+        text = self.dsl.to_ssml(text, transformations_applied)
         
         # Log transformations if detailed logging is enabled
         if self.detailed_logging and transformations_applied:
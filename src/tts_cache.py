@@ -0,0 +1,210 @@
+"""
+Content-addressed on-disk cache for synthesized TTS segments
+with size- and age-based LRU eviction
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+
+
+class TTSCache:
+    """Persistent cache of ElevenLabs audio keyed by a hash of the request"""
+
+    def __init__(self, cache_dir="tts_cache", max_size_mb=1024, max_age_days=90):
+        """
+        Args:
+            cache_dir (str): Directory where cached audio is stored.
+            max_size_mb (float): Total cache size before least recently used entries are evicted.
+                                 0 disables the size limit.
+            max_age_days (float): Entries not used for this many days are evicted. 0 disables the age limit.
+        """
+        self.cache_dir = cache_dir
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+        self.max_age_seconds = max_age_days * 24 * 3600
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()  # Segments may be synthesized from several threads
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        # key -> [size_bytes, last_used]; file mtime doubles as last-used time on disk
+        self._index = {}
+        self._total_size = 0
+        self._load_index()
+
+    @staticmethod
+    def make_key(text, voice_id, model_id, voice_settings, output_format):
+        """Build the cache key for one TTS request"""
+        payload = json.dumps({
+            "text": text,
+            "voice_id": voice_id,
+            "model_id": model_id,
+            "voice_settings": voice_settings,
+            "output_format": output_format
+        }, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key[:2], f"{key}.audio")
+
+    def _load_index(self):
+        """Scan the cache directory once so eviction does not need to rescan it"""
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if not name.endswith('.audio'):
+                    continue
+                stat = os.stat(os.path.join(root, name))
+                self._index[name[:-len('.audio')]] = [stat.st_size, stat.st_mtime]
+                self._total_size += stat.st_size
+        self._evict()
+
+    def get(self, key):
+        """Return cached audio bytes for key, or None on a miss
+
+        Only the index lookup holds the lock; the file is read outside it so
+        parallel synthesis workers do not queue behind each other's disk reads.
+        """
+        path = self._path(key)
+
+        with self._lock:
+            entry = self._index.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            now = time.time()
+            if self.max_age_seconds and now - entry[1] > self.max_age_seconds:
+                self._remove(key)
+                self.misses += 1
+                return None
+
+            # Touch the entry so LRU eviction sees it as recently used
+            entry[1] = now
+
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            with self._lock:
+                self._remove(key)
+                self.misses += 1
+            return None
+
+        try:
+            os.utime(path, (now, now))
+        except OSError:
+            pass  # Evicted meanwhile; the data is already read
+        with self._lock:
+            self.hits += 1
+        return data
+
+    def contains(self, key):
+        """Check for a usable entry without counting a hit or miss"""
+        with self._lock:
+            entry = self._index.get(key)
+            if entry is None:
+                return False
+            if self.max_age_seconds and time.time() - entry[1] > self.max_age_seconds:
+                return False
+            return os.path.exists(self._path(key))
+
+    def put(self, key, data):
+        """Store audio bytes under key and evict old entries if needed"""
+        if not data:
+            return
+
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # Write to a temp name first so a crash never leaves a truncated entry
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(temp_path, "wb") as f:
+                f.write(data)
+            self._commit(key, temp_path, len(data))
+        except OSError:
+            self._discard(temp_path)
+            raise
+
+    def put_file(self, key, source_path):
+        """Store an existing audio file under key without loading it into memory"""
+        size = os.path.getsize(source_path)
+        if not size:
+            return
+
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            shutil.copyfile(source_path, temp_path)
+            self._commit(key, temp_path, size)
+        except OSError:
+            self._discard(temp_path)
+            raise
+
+    @staticmethod
+    def _discard(temp_path):
+        """Remove the temp file of a failed write"""
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+
+    def _commit(self, key, temp_path, size):
+        """Move a fully written temp file into place and account for it"""
+        with self._lock:
+            os.replace(temp_path, self._path(key))
+
+            if key in self._index:
+                self._total_size -= self._index[key][0]
+            self._index[key] = [size, time.time()]
+            self._total_size += size
+
+            self._evict()
+
+    def _remove(self, key):
+        entry = self._index.pop(key, None)
+        if entry:
+            self._total_size -= entry[0]
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+        except PermissionError:
+            pass  # Being read outside the lock (Windows); the next index scan picks it up again
+
+    def _evict(self):
+        """Drop expired entries, then least recently used ones until under the size limit"""
+        if self.max_age_seconds:
+            cutoff = time.time() - self.max_age_seconds
+            for key in [k for k, (_, used) in self._index.items() if used < cutoff]:
+                self._remove(key)
+
+        if self.max_size_bytes and self._total_size > self.max_size_bytes:
+            for key, _ in sorted(self._index.items(), key=lambda item: item[1][1]):
+                if self._total_size <= self.max_size_bytes:
+                    break
+                self._remove(key)
+
+    def clear(self):
+        """Remove all cached entries"""
+        with self._lock:
+            for key in list(self._index):
+                self._remove(key)
+
+    def get_stats(self):
+        """Get hit/miss counters and current cache size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._index),
+                "size_bytes": self._total_size
+            }
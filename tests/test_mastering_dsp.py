@@ -0,0 +1,29 @@
+import numpy as np
+
+from src import mastering_dsp
+
+PRESET = {"compression": "medium", "normalization": "-3"}
+
+
+def test_master_array_empty_input():
+    mono = mastering_dsp.master_array(np.zeros(0, dtype=np.int16), 44100, PRESET)
+    assert mono.shape == (0,) and mono.dtype == np.int16
+
+    stereo = mastering_dsp.master_array(np.zeros((0, 2)), 44100, PRESET)
+    assert stereo.shape == (0, 2) and stereo.dtype == np.float64
+
+
+def test_master_array_normalizes_to_preset_peak():
+    t = np.arange(44100) / 44100
+    samples = 0.3 * np.sin(2 * np.pi * 440 * t)
+    mastered = mastering_dsp.master_array(samples, 44100, PRESET)
+    assert mastered.shape == samples.shape
+    assert np.isclose(20 * np.log10(np.abs(mastered).max()), -3.0)
+
+
+def test_chunking_does_not_change_output():
+    rng = np.random.default_rng(0)
+    samples = rng.standard_normal((44100, 2)) * 0.1
+    whole = mastering_dsp.master_array(samples, 44100, PRESET, chunk_frames=1 << 16)
+    chunked = mastering_dsp.master_array(samples, 44100, PRESET, chunk_frames=mastering_dsp.BLOCK * 7)
+    assert np.allclose(whole, chunked, atol=1e-12)